@@ -59,6 +59,11 @@ function requireAdmin(request, env) {
 
 async function readJson(request) {
   try {
+    // The collector gzips larger upload bodies.
+    if ((request.headers.get("content-encoding") || "").toLowerCase() === "gzip") {
+      const inflated = request.body.pipeThrough(new DecompressionStream("gzip"));
+      return { ok: true, body: await new Response(inflated).json() };
+    }
     return { ok: true, body: await request.json() };
   } catch (err) {
     return { ok: false, error: err };
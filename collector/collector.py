@@ -1,19 +1,47 @@
 import argparse
+import base64
+import functools
+import gzip
+import heapq
+import http.client
 import json
+import mmap
 import os
 import random
+import re
+import signal
 import socket
+import sqlite3
 import ssl
+import struct
 import sys
+import tempfile
+import threading
 import time
 import urllib.error
 import urllib.parse
 import urllib.request
 import uuid
+from array import array
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, asdict, field
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Tuple
+from typing import ClassVar, Dict, List, Optional, Sequence, Tuple
+
+# orjson is optional: used for encoding when installed, stdlib json otherwise.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# httpx with its HTTP/2 extra is optional: when installed, DoH GETs share one
+# multiplexed HTTP/2 connection per resolver across all worker threads.
+try:
+    import h2  # noqa: F401  (httpx needs it for http2=True)
+    import httpx
+except ImportError:
+    httpx = None
 
 
 # ---------------------------------------------------------------------------
@@ -41,33 +69,122 @@ WORDS_VERBS_PATH = os.path.join(WORDS_DIR, "words_10_verbs.txt")
 WORDS_ADJECTIVES_PATH = os.path.join(WORDS_DIR, "words_10_adjectives.txt")
 WORDS_ADVERBS_PATH = os.path.join(WORDS_DIR, "words_10_adverbs.txt")
 CONFIG_FILE = os.path.join(BASE_DIR, "config.local.json")
+LOOKUP_CACHE_FILE = os.path.join(BASE_DIR, "state_lookup_cache.sqlite3")
 
 
 CHARSET = "abcdefghijklmnopqrstuvwxyz0123456789"
 MAX_LENGTH = 10
 
-# Default DNS-over-HTTPS resolvers (you can override these in config.local.json)
+# len(CHARSET) ** length for every reachable label length, so hot paths index
+# a tuple instead of recomputing the power per domain.
+TOTAL_BY_LENGTH = tuple(len(CHARSET) ** L for L in range(MAX_LENGTH + 2))
+
+
+def total_for_length(length: int, charset: str = CHARSET) -> int:
+    """Number of distinct labels of `length` characters over `charset`."""
+    if charset == CHARSET and 0 <= length < len(TOTAL_BY_LENGTH):
+        return TOTAL_BY_LENGTH[length]
+    return len(charset) ** length
+
+
+# Worker threads for DNS/HTTP checks when neither --workers nor the config's
+# worker_count is set. Every check in a block targets a different host, so the
+# pool mostly overlaps network waits; a block then takes about as long as its
+# slowest few checks rather than the sum of all of them. A config that sets
+# per_request_delay_ms (honoured only single-threaded) keeps the serial default.
+DEFAULT_WORKER_COUNT = 25
+
+# Domains per block when --block-size is not given: drawn uniformly per block.
+BLOCK_SIZE_MIN = 25
+BLOCK_SIZE_MAX = 80
+
+# Resolver ranking (see pick_resolver in run()): smoothing factor for the
+# per-resolver latency / error-rate EWMAs, and how hard errors weigh on the score.
+RESOLVER_EWMA_ALPHA = 0.1
+RESOLVER_ERROR_PENALTY = 5
+# Circuit breaker: after its n-th consecutive error a resolver is skipped for
+# min(2**n, RESOLVER_BREAKER_MAX_SECONDS) seconds, unless no other is usable.
+RESOLVER_BREAKER_MAX_SECONDS = 60
+
+# Default DNS-over-HTTPS resolvers (you can override these in config.local.json).
+# "format": "wire" sends RFC 8484 application/dns-message queries; resolvers
+# without it are queried through the DNS JSON API (?name=...&type=A).
 DEFAULT_DNS_RESOLVERS = [
     {
         "name": "cloudflare",
         "url": "https://cloudflare-dns.com/dns-query",
+        "format": "wire",
     },
     {
         "name": "google",
-        "url": "https://dns.google/resolve",
+        "url": "https://dns.google/dns-query",
+        "format": "wire",
     },
     {
         "name": "quad9",
         "url": "https://dns.quad9.net/dns-query",
+        "format": "wire",
     },
     {
         "name": "opendns",
         "url": "https://doh.opendns.com/dns-query",
+        "format": "wire",
     },
 ]
 
 
-@dataclass
+def _json_bytes(data: Dict, indent: bool = False) -> bytes:
+    """Encode `data` as UTF-8 JSON, via orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(data, indent=2 if indent else None).encode("utf-8")
+
+
+def _json_loads(data: bytes):
+    """Decode UTF-8 JSON bytes, via orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# path -> bytes this process last wrote there, so unchanged state (e.g. the
+# word pointer during a --short run) is not rewritten every checkpoint.
+_LAST_WRITTEN: Dict[str, bytes] = {}
+
+
+def _write_json_atomic(path: str, data: Dict, durable: bool = False) -> None:
+    """Write `data` as compact JSON to `path` via a temp file and os.replace, so
+    a crash mid-write leaves the previous checkpoint intact instead of a torn
+    file. Skips the write when the bytes match what was last written there.
+
+    durable=True also fsyncs the temp file before the rename, so the new
+    contents survive an OS crash / power loss rather than just a process crash.
+    """
+    payload = _json_bytes(data)
+    if not durable and _LAST_WRITTEN.get(path) == payload and os.path.exists(path):
+        return
+    # A unique temp name per write: shards running side by side in one
+    # checkout may save the same file at the same moment.
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    _LAST_WRITTEN[path] = payload
+
+
+@dataclass(slots=True)
 class Pointer:
     version: int = 1
     charset: str = CHARSET
@@ -78,29 +195,74 @@ class Pointer:
     batch_size: int = 25
     # Per-length state mapping: length (as string) -> {tld_index, index, done}
     length_states: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    # --shard i/N: this pointer only walks label indices with index % N == i.
+    # Each shard keeps its own pointer file / cloud key (see state_key()).
+    shard_id: int = 0
+    shard_count: int = 1
+
+    # TODO: make this configurable via a file or CLI; for now a fixed sample
+    # of widely used/commercial TLDs. A class-level tuple (not a per-access
+    # list) since the batch generators index it in their inner loops.
+    TLDS: ClassVar[Tuple[str, ...]] = (
+        "com",
+        "net",
+        "org",
+        "io",
+        "co",
+        "info",
+        "biz",
+        "online",
+        "store",
+        "app",
+        "dev",
+        "ai",
+        "xyz",
+        "me",
+    )
+
+    @staticmethod
+    def state_key(shard_id: int = 0, shard_count: int = 1) -> str:
+        """Cloud-state key for a shard; the unsharded pointer keeps the original key."""
+        if shard_count <= 1:
+            return "short_pointer"
+        return f"short_pointer.shard{shard_id}of{shard_count}"
+
+    @staticmethod
+    def local_path(shard_id: int = 0, shard_count: int = 1) -> str:
+        if shard_count <= 1:
+            return POINTER_FILE
+        return os.path.join(BASE_DIR, f"state_pointer.shard{shard_id}of{shard_count}.json")
+
+    def to_dict(self) -> Dict:
+        """Shallow field dict for serialization. Unlike dataclasses.asdict this
+        does not deep-copy length_states on every checkpoint."""
+        return {
+            "version": self.version,
+            "charset": self.charset,
+            "max_length": self.max_length,
+            "tld_index": self.tld_index,
+            "length": self.length,
+            "index": self.index,
+            "batch_size": self.batch_size,
+            "length_states": self.length_states,
+            "shard_id": self.shard_id,
+            "shard_count": self.shard_count,
+        }
+
+    def snapshot(self) -> Dict:
+        """Field dict that later batch generation cannot change: unlike
+        to_dict() the per-length states (and their per-TLD indices) are copied."""
+        data = self.to_dict()
+        data["length_states"] = {
+            key: {k: dict(v) if isinstance(v, dict) else v for k, v in st.items()}
+            for key, st in self.length_states.items()
+        }
+        return data
 
-    @property
-    def tlds(self) -> List[str]:
-        # TODO: make this configurable via a file or CLI; for now a fixed sample
-        # of widely used/commercial TLDs.
-        return [
-            "com",
-            "net",
-            "org",
-            "io",
-            "co",
-            "info",
-            "biz",
-            "online",
-            "store",
-            "app",
-            "dev",
-            "ai",
-            "xyz",
-            "me",
-        ]
-
-    def save(self) -> None:
+    def save(self, durable: bool = False, state: Optional[Dict] = None) -> None:
+        """Persist the pointer, or `state` (a snapshot() of it) when given."""
+        if state is None:
+            state = self.to_dict()
         # Cloud mode: push the pointer to the Worker's state endpoint. We
         # still mirror to the local file if the write fails, so progress is
         # not lost to an API blip.
@@ -108,44 +270,63 @@ class Pointer:
             ok = put_cloud_state(
                 _CLOUD_STATE["api_base"],
                 _CLOUD_STATE["api_key"],
-                "short_pointer",
-                asdict(self),
+                self.state_key(self.shard_id, self.shard_count),
+                state,
             )
             if ok:
                 return
             # Fall through to local write as a cache
-        with open(POINTER_FILE, "w", encoding="utf-8") as f:
-            json.dump(asdict(self), f, indent=2)
+        _write_json_atomic(self.local_path(self.shard_id, self.shard_count), state, durable)
 
     @classmethod
-    def load(cls) -> "Pointer":
+    def load(cls, shard_id: int = 0, shard_count: int = 1) -> "Pointer":
         data = None
+        path = cls.local_path(shard_id, shard_count)
         # Cloud mode: prefer the remote pointer. If it's missing, fall back
         # to any local file (useful when migrating from local→cloud).
         if _CLOUD_STATE["enabled"]:
             remote = get_cloud_state(
                 _CLOUD_STATE["api_base"],
                 _CLOUD_STATE["api_key"],
-                "short_pointer",
+                cls.state_key(shard_id, shard_count),
             )
             if isinstance(remote, dict):
                 data = remote
 
         if data is None:
-            if not os.path.exists(POINTER_FILE):
+            try:
+                with open(path, "rb") as f:
+                    data = _json_loads(f.read())
+            except FileNotFoundError:
                 ptr = cls()
             else:
-                with open(POINTER_FILE, "r", encoding="utf-8") as f:
-                    data = json.load(f)
                 ptr = cls(**data)
         else:
             ptr = cls(**data)
 
+        ptr.shard_id = shard_id
+        ptr.shard_count = shard_count
+
         # Migrate older pointer state to per-length tracking if needed
         if getattr(ptr, "version", 1) < 2 or not getattr(ptr, "length_states", None):
             ptr.migrate_to_v2()
         return ptr
 
+    def unfinished_lengths(self) -> List[int]:
+        """Sorted label lengths (1..max_length) whose per-length state is not done."""
+        lengths = []
+        for key, st in (self.length_states or {}).items():
+            if st.get("done"):
+                continue
+            try:
+                L = int(key)
+            except (TypeError, ValueError):
+                continue
+            if 1 <= L <= self.max_length:
+                lengths.append(L)
+        lengths.sort()
+        return lengths
+
     def migrate_to_v2(self) -> None:
         """Initialize per-length state based on the legacy single-pointer fields.
 
@@ -154,14 +335,14 @@ class Pointer:
         """
         length_states: Dict[str, Dict[str, int]] = {}
         for L in range(1, self.max_length + 1):
-            total_for_length = len(self.charset) ** L
+            total = total_for_length(L, self.charset)
             key = str(L)
             if L < self.length:
                 # All labels for this length have been iterated across all TLDs.
-                length_states[key] = {"tld_index": 0, "index": total_for_length, "done": True}
+                length_states[key] = {"tld_index": 0, "index": total, "done": True}
             elif L == self.length:
                 length_states[key] = {
-                    "tld_index": max(0, min(self.tld_index, len(self.tlds) - 1)),
+                    "tld_index": max(0, min(self.tld_index, len(self.TLDS) - 1)),
                     "index": max(0, self.index),
                     "done": False,
                 }
@@ -172,42 +353,87 @@ class Pointer:
         self.version = 2
 
 
+# Every two-character label over CHARSET in index order. index_to_label peels
+# two digits per divmod against this table for the default charset, halving the
+# number of interpreter-level steps per label.
+_CHARSET_PAIRS = tuple(a + b for a in CHARSET for b in CHARSET)
+
+
 def index_to_label(idx: int, length: int, charset: str) -> str:
     base = len(charset)
     chars = []
-    for _ in range(length):
+    remaining = length
+    if charset == CHARSET:
+        pair_base = len(_CHARSET_PAIRS)
+        while remaining >= 2:
+            idx, r = divmod(idx, pair_base)
+            chars.append(_CHARSET_PAIRS[r])
+            remaining -= 2
+    for _ in range(remaining):
         chars.append(charset[idx % base])
         idx //= base
     return "".join(reversed(chars))
 
 
-def generate_batch(pointer: Pointer) -> List[Tuple[str, str]]:
-    """Return a batch of (domain, tld) pairs using the legacy single-pointer scheme.
+def index_to_labels(start: int, count: int, length: int, charset: str, step: int = 1) -> List[str]:
+    """Return the `count` labels at indices start, start + step, start + 2*step, ...
+
+    Equivalent to
+    [index_to_label(i, length, charset) for i in range(start, start + count * step, step)]
+    but decodes the (length - 1)-char prefix once per run of labels sharing it and
+    only varies the last character inside the run (every step-th char of the charset),
+    instead of re-decoding every digit for every label.
+    """
+    base = len(charset)
+    labels: List[str] = []
+    idx = start
+    remaining = count
+    while remaining > 0:
+        prefix_idx, first = divmod(idx, base)
+        last_chars = charset[first::step][:remaining]
+        prefix = index_to_label(prefix_idx, length - 1, charset)
+        labels.extend([prefix + ch for ch in last_chars])
+        remaining -= len(last_chars)
+        idx += len(last_chars) * step
+    return labels
+
+
+def generate_batch(pointer: Pointer) -> List[Tuple[str, str, str, int]]:
+    """Return a batch of (domain, tld, label, label_length) tuples using the legacy single-pointer scheme.
 
     This is kept for compatibility but new code should prefer generate_batch_for_length
     together with Pointer.length_states.
     """
-    batch: List[Tuple[str, str]] = []
+    batch: List[Tuple[str, str, str, int]] = []
+    tlds = Pointer.TLDS
+    n_tlds = len(tlds)
+    step = max(1, pointer.shard_count)
+    # Only indices with index % shard_count == shard_id belong to this shard.
+    pointer.index += (pointer.shard_id - pointer.index) % step
 
     while len(batch) < pointer.batch_size and pointer.length <= pointer.max_length:
-        tld = pointer.tlds[pointer.tld_index]
+        tld = tlds[pointer.tld_index]
 
         # total combinations for this length
-        total_for_length = len(pointer.charset) ** pointer.length
-        if pointer.index >= total_for_length:
+        total = total_for_length(pointer.length, pointer.charset)
+        if pointer.index >= total:
             # Move to next TLD for this length
             pointer.tld_index += 1
-            pointer.index = 0
-            if pointer.tld_index >= len(pointer.tlds):
+            pointer.index = pointer.shard_id
+            if pointer.tld_index >= n_tlds:
                 pointer.tld_index = 0
                 pointer.length += 1
             continue
 
-        label = index_to_label(pointer.index, pointer.length, pointer.charset)
-        pointer.index += 1
+        # Emit as much of the current (tld, length) segment as fits in one go.
+        remaining = (total - pointer.index + step - 1) // step
+        count = min(pointer.batch_size - len(batch), remaining)
+        labels = index_to_labels(pointer.index, count, pointer.length, pointer.charset, step)
+        pointer.index += count * step
 
-        domain = f"{label}.{tld}"
-        batch.append((domain, tld))
+        length = pointer.length
+        suffix = "." + tld
+        batch.extend((label + suffix, tld, label, length) for label in labels)
 
     return batch
 
@@ -216,54 +442,70 @@ def generate_batch_for_length(
     length_state: Dict[str, int],
     length: int,
     charset: str,
-    tlds: List[str],
+    tlds: Sequence[str],
     batch_size: int,
-) -> List[Tuple[str, str]]:
-    """Generate a batch of (domain, tld) pairs for a specific label length.
+    shard_id: int = 0,
+    shard_count: int = 1,
+) -> List[Tuple[str, str, str, int]]:
+    """Generate a batch of (domain, tld, label, label_length) tuples for a specific label length.
 
     This implementation keeps separate per-TLD indices for the given length so
     that we can round-robin across TLDs and allow newly added TLDs to "catch
     up" toward the average number of labels checked at this length.
+
+    With shard_count > 1 only label indices where index % shard_count == shard_id
+    are generated, so N collectors can split the space without coordinating.
     """
-    batch: List[Tuple[str, str]] = []
+    batch: List[Tuple[str, str, str, int]] = []
 
-    total_for_length = len(charset) ** length
-    if total_for_length <= 0 or not tlds:
+    total = total_for_length(length, charset)
+    if total <= 0 or not tlds:
         length_state["done"] = True
         return batch
 
     # Initialize per-TLD indices if needed and keep them in sync with the
     # current TLD list from the Pointer. Any TLD not present in the current
-    # set is dropped; new TLDs start from index 0 for this length.
-    per_tld_index = length_state.get("per_tld_index") or {}
-    # Add new TLDs
+    # set is dropped; new TLDs start from index 0 for this length. Rebuilding
+    # the dict also re-keys it by the (interned) strings in `tlds` rather than
+    # the copies parsed out of the saved JSON, so per-domain lookups hit the
+    # identity fast path.
+    stored_index = length_state.get("per_tld_index") or {}
+    step = max(1, shard_count)
+    per_tld_index = {}
     for tld in tlds:
-        if tld not in per_tld_index:
-            per_tld_index[tld] = 0
-    # Drop TLDs that are no longer tracked
-    for tld in list(per_tld_index.keys()):
-        if tld not in tlds:
-            per_tld_index.pop(tld, None)
+        idx = stored_index.get(tld, 0)
+        # Align up to the next index owned by this shard.
+        per_tld_index[tld] = idx + (shard_id - idx) % step
 
     length_state["per_tld_index"] = per_tld_index
+    suffixes = {tld: "." + tld for tld in tlds}
 
     # Round-robin cursor over the TLD list for this length
     rr_cursor = int(length_state.get("rr_cursor", 0) or 0)
 
+    # Exhaustion bookkeeping is hoisted out of the per-domain loop: the index
+    # sum backs the running average, and `live` counts TLDs that still have
+    # labels left, so the length is marked done the moment the last one runs
+    # out instead of rescanning every TLD on each pick.
+    n_tlds = len(tlds)
+    index_sum = sum(per_tld_index.values())
+    live = sum(1 for v in per_tld_index.values() if v < total)
+    if live == 0:
+        length_state["done"] = True
+
+    # TLD of each pick in order, and the first index taken from each TLD.
+    # A TLD's picks are consecutive indices (spaced by step), so its labels
+    # can be decoded as one run by index_to_labels after the loop.
+    picks: List[str] = []
+    first_index: Dict[str, int] = {}
+
     # Main loop: pick TLDs in a mix of round-robin and catch-up mode.
-    while len(batch) < batch_size and per_tld_index:
-        # Compute average number of labels checked per TLD at this length.
-        counts = [per_tld_index[tld] for tld in tlds if tld in per_tld_index]
-        if not counts:
-            break
-        avg = sum(counts) / float(len(counts)) if counts else 0.0
+    while len(picks) < batch_size and live:
+        # Average number of labels checked per TLD at this length.
+        avg = index_sum / n_tlds
 
         # TLDs that are behind the average for this length.
-        deficit_tlds = [
-            tld
-            for tld in tlds
-            if tld in per_tld_index and per_tld_index[tld] < avg
-        ]
+        deficit_tlds = [tld for tld in tlds if per_tld_index[tld] < avg]
 
         # With 50% probability, bias selection toward deficit TLDs to help
         # them catch up; otherwise use simple round-robin over all TLDs.
@@ -272,33 +514,35 @@ def generate_batch_for_length(
             # Choose the most under-served TLD (smallest per_tld_index).
             tld = min(deficit_tlds, key=lambda t: per_tld_index[t])
         else:
-            tld = tlds[rr_cursor % len(tlds)]
+            tld = tlds[rr_cursor % n_tlds]
             rr_cursor += 1
 
-        # If this TLD is no longer in per_tld_index (edge case after sync),
-        # skip it and continue.
-        if tld not in per_tld_index:
-            continue
-
         idx = per_tld_index[tld]
-        if idx >= total_for_length:
-            # Exhausted this TLD's label space at this length. If all TLDs are
-            # exhausted, mark the length as done; otherwise, continue with others.
-            if all(v >= total_for_length for v in per_tld_index.values()):
-                length_state["done"] = True
-                break
-            else:
-                continue
+        if idx >= total:
+            # This TLD's label space is exhausted; others are still live.
+            continue
 
-        label = index_to_label(idx, length, charset)
-        per_tld_index[tld] = idx + 1
+        # Only record the pick here; labels are decoded in runs below.
+        first_index.setdefault(tld, idx)
+        picks.append(tld)
+        per_tld_index[tld] = idx + step
+        index_sum += step
 
-        domain = f"{label}.{tld}"
-        batch.append((domain, tld))
+        if idx + step >= total:
+            live -= 1
+            if not live:
+                length_state["done"] = True
 
     length_state["per_tld_index"] = per_tld_index
     length_state["rr_cursor"] = rr_cursor
 
+    runs = {
+        tld: iter(index_to_labels(start, (per_tld_index[tld] - start) // step, length, charset, step))
+        for tld, start in first_index.items()
+    }
+    for tld in picks:
+        label = next(runs[tld])
+        batch.append((label + suffixes[tld], tld, label, length))
     return batch
 
 
@@ -307,35 +551,81 @@ class WordPointer:
     version: int = 1
     index: int = 0  # index into the word list
 
-    def save(self) -> None:
-        with open(WORDS_POINTER_FILE, "w", encoding="utf-8") as f:
-            json.dump(asdict(self), f, indent=2)
+    def save(self, durable: bool = False, state: Optional[Dict] = None) -> None:
+        _write_json_atomic(WORDS_POINTER_FILE, asdict(self) if state is None else state, durable)
 
     @classmethod
     def load(cls) -> "WordPointer":
-        if not os.path.exists(WORDS_POINTER_FILE):
+        try:
+            with open(WORDS_POINTER_FILE, "rb") as f:
+                data = _json_loads(f.read())
+        except FileNotFoundError:
             return cls()
-        with open(WORDS_POINTER_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
         return cls(**data)
 
 
-def load_words() -> List[str]:
-    if not os.path.exists(WORDS_FILE):
+class WordList:
+    """Read-only sequence of the words in a one-word-per-line file.
+
+    The file is mmapped and only the (start, end) offset of each stripped,
+    non-empty line is kept, in two int64 arrays; a word is decoded when it is
+    indexed. That is 16 bytes per word instead of a str object per word.
+    """
+
+    # A stripped non-empty line: from its first to its last non-space byte.
+    _LINE_RE = re.compile(rb"\S(?:[^\n]*\S)?")
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            try:
+                self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped.
+                self._buf = b""
+        self._starts = array("q")
+        self._ends = array("q")
+        for m in self._LINE_RE.finditer(self._buf):
+            self._starts.append(m.start())
+            self._ends.append(m.end())
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __getitem__(self, i: int) -> str:
+        return self._buf[self._starts[i]:self._ends[i]].decode("utf-8")
+
+
+@functools.lru_cache(maxsize=1)
+def _open_word_list(path: str, mtime_ns: int, size: int) -> WordList:
+    # mtime_ns/size only key the cache: a regenerated file gets a new entry.
+    return WordList(path)
+
+
+def load_words() -> WordList:
+    """Return the word list, mapping WORDS_FILE on first use and reusing it after.
+
+    Callers share one WordList until the file changes on disk (load_dictionary
+    replaces it atomically), after which the next call maps the new file; a
+    missing file is not cached and is retried on the next call.
+    """
+    try:
+        st = os.stat(WORDS_FILE)
+        return _open_word_list(WORDS_FILE, st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
         raise RuntimeError(
             f"Word file {WORDS_FILE} not found. Run `python load_dictionary.py` in the collector folder first."
-        )
-    with open(WORDS_FILE, "r", encoding="utf-8") as f:
-        return [line.strip() for line in f if line.strip()]
+        ) from None
 
 
 def load_word_pos_index() -> Dict[str, str]:
     index: Dict[str, str] = {}
 
     def load_pos(path: str, code: str) -> None:
-        if not os.path.exists(path):
+        try:
+            f = open(path, "r", encoding="utf-8")
+        except FileNotFoundError:
             return
-        with open(path, "r", encoding="utf-8") as f:
+        with f:
             for line in f:
                 w = line.strip()
                 if not w:
@@ -351,16 +641,26 @@ def load_word_pos_index() -> Dict[str, str]:
     return index
 
 
-def generate_word_batch(word_pointer: WordPointer, tlds: List[str], count: int) -> List[Tuple[str, str]]:
-    """Generate up to `count` (domain, tld) pairs from the word list and advance the word pointer."""
-    words = load_words()
+def generate_word_batch(
+    word_pointer: WordPointer,
+    tlds: Sequence[str],
+    count: int,
+    words: Optional[Sequence[str]] = None,
+) -> List[Tuple[str, str, str, int]]:
+    """Generate up to `count` (domain, tld, label, label_length) tuples from the word list and advance the word pointer.
+
+    `words` defaults to load_words(), which is cached after the first call.
+    """
+    if words is None:
+        words = load_words()
     if not words:
         return []
 
-    batch: List[Tuple[str, str]] = []
+    batch: List[Tuple[str, str, str, int]] = []
     idx = word_pointer.index
     total_words = len(words)
     tld_index = 0
+    suffixes = ["." + tld for tld in tlds]
 
     while len(batch) < count and total_words > 0:
         if idx >= total_words:
@@ -368,61 +668,333 @@ def generate_word_batch(word_pointer: WordPointer, tlds: List[str], count: int)
             idx = 0
 
         word = words[idx]
+        word_length = len(word)
         idx += 1
 
         # cycle through TLDs for this word until we hit count
         for _ in range(len(tlds)):
             if len(batch) >= count:
                 break
-            tld = tlds[tld_index]
+            batch.append((word + suffixes[tld_index], tlds[tld_index], word, word_length))
             tld_index = (tld_index + 1) % len(tlds)
-            domain = f"{word}.{tld}"
-            batch.append((domain, tld))
 
     word_pointer.index = idx
     return batch
 
 
+# resolver_url -> "<scheme>://<netloc><path>?name=", so build_doh_url parses
+# each resolver URL once rather than once per query.
+_DOH_URL_PREFIXES: Dict[str, str] = {}
+
+
 def build_doh_url(resolver_url: str, domain: str) -> str:
     """Build a DNS-over-HTTPS URL for an A record lookup.
 
     Both Cloudflare and Google support name/type query parameters returning DNS JSON.
     """
-    parsed = urllib.parse.urlparse(resolver_url)
-    base = f"{parsed.scheme}://{parsed.netloc}{parsed.path or ''}"
-    query = urllib.parse.urlencode({"name": domain, "type": "A"})
-    return f"{base}?{query}"
+    prefix = _DOH_URL_PREFIXES.get(resolver_url)
+    if prefix is None:
+        parsed = urllib.parse.urlparse(resolver_url)
+        prefix = _DOH_URL_PREFIXES[resolver_url] = f"{parsed.scheme}://{parsed.netloc}{parsed.path or ''}?name="
+    # Same output as urlencode({"name": domain, "type": "A"}).
+    return prefix + urllib.parse.quote_plus(domain) + "&type=A"
 
 
-def check_domain_dns(domain: str, resolver: Dict) -> Dict:
-    """DNS/registration check using DNS-over-HTTPS.
+# RFC 8484 wireformat. A query is a 12-byte header (ID 0 so answers stay
+# HTTP-cacheable, RD set, one question) plus QNAME / QTYPE A / QCLASS IN,
+# sent base64url-encoded without padding as ?dns=.
+_DNS_QUERY_HEADER = struct.pack("!HHHHHH", 0, 0x0100, 1, 0, 0, 0)
+_DNS_QUESTION_A_IN = struct.pack("!HH", 1, 1)
 
-    resolver is a dict with at least a 'url' key.
-    """
-    url = build_doh_url(resolver["url"], domain)
-    req = urllib.request.Request(
-        url,
-        headers={
-            "Accept": "application/dns-json",
-            "User-Agent": "dom4in-collector/1.0",
-        },
+
+def build_doh_wire_url(resolver_url: str, domain: str) -> str:
+    """Build an RFC 8484 GET URL for an A record lookup."""
+    qname = b"".join(
+        bytes((len(label),)) + label for label in domain.rstrip(".").encode("idna").split(b".")
     )
+    query = _DNS_QUERY_HEADER + qname + b"\0" + _DNS_QUESTION_A_IN
+    sep = "&" if "?" in resolver_url else "?"
+    return resolver_url + sep + "dns=" + base64.urlsafe_b64encode(query).rstrip(b"=").decode("ascii")
+
+
+def _skip_dns_name(msg: bytes, pos: int) -> int:
+    while True:
+        n = msg[pos]
+        if n == 0:
+            return pos + 1
+        if n & 0xC0 == 0xC0:
+            # Compression pointer: the name ends here.
+            return pos + 2
+        pos += n + 1
+
 
+def parse_doh_wire(msg: bytes) -> Dict:
+    """Decode an application/dns-message answer into the DNS JSON shape.
+
+    Only what _parse_doh_answer and the DNS cache read is kept: Status (the
+    RCODE) plus type/TTL of the Answer and Authority records.
+    Raises ValueError on a truncated or malformed message.
+    """
     try:
-        with urllib.request.urlopen(req, timeout=3) as resp:
-            if resp.status != 200:
-                return {"resolver_error": True}
-            body = resp.read()
-    except (urllib.error.URLError, socket.timeout, ssl.SSLError):
-        return {"resolver_error": True}
+        _, flags, qdcount, ancount, nscount, _ = struct.unpack_from("!HHHHHH", msg)
+        pos = 12
+        for _ in range(qdcount):
+            pos = _skip_dns_name(msg, pos) + 4
+        sections = []
+        for count in (ancount, nscount):
+            records = []
+            for _ in range(count):
+                pos = _skip_dns_name(msg, pos)
+                rtype, _, ttl, rdlength = struct.unpack_from("!HHIH", msg, pos)
+                pos += 10 + rdlength
+                records.append({"type": rtype, "TTL": ttl})
+            sections.append(records)
+    except (IndexError, struct.error) as e:
+        raise ValueError("malformed DNS message") from e
+    if pos > len(msg):
+        raise ValueError("truncated DNS message")
+    data: Dict = {"Status": flags & 0x000F}
+    if sections[0]:
+        data["Answer"] = sections[0]
+    if sections[1]:
+        data["Authority"] = sections[1]
+    return data
+
+
+# ---------------------------------------------------------------------------
+# Persistent HTTP connections.
+#
+# urlopen() pays a fresh TCP + TLS handshake for every query, which dominates
+# the cost of a ~100-byte DoH answer. Instead each thread keeps one keep-alive
+# connection per host and sends all of its requests to that host over it:
+# worker threads reuse theirs for DoH queries, the main thread for the Worker
+# upload/admin calls. http.client connections are not thread-safe, hence the
+# thread-local pool. A reused connection the server has since closed fails on
+# first use; that case is retried once on a fresh connection.
+# ---------------------------------------------------------------------------
+_SSL_CONTEXT = ssl.create_default_context()
+_DOH_TIMEOUT_SECONDS = 3
+_DOH_HEADERS = {
+    "Accept": "application/dns-json",
+    "User-Agent": "dom4in-collector/1.0",
+}
+_DOH_WIRE_HEADERS = {
+    "Accept": "application/dns-message",
+    "User-Agent": "dom4in-collector/1.0",
+}
+_http_local = threading.local()
+
+# (host, port) -> IP address resolved once by pin_resolver_addresses(), so new
+# resolver connections skip the system DNS lookup of the resolver's own name.
+# TLS still uses the hostname for SNI and certificate checks, and so does the
+# Host header; only the TCP connect goes to the pinned address. This covers
+# the http.client pool below (batch POSTs, and DoH GETs when httpx is not
+# installed); the httpx client resolves names itself, once per connection.
+_PINNED_ADDRS: Dict[Tuple[str, int], str] = {}
+
+
+def pin_resolver_addresses(resolvers: Sequence[Dict]) -> None:
+    """Resolve each resolver's hostname once and pin new connections to it.
+
+    Best-effort: hosts that fail to resolve here are left to normal lookup.
+    """
+    for resolver in resolvers:
+        parsed = urllib.parse.urlsplit(resolver["url"])
+        host = parsed.hostname
+        if not host:
+            continue
+        port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        if (host, port) in _PINNED_ADDRS:
+            continue
+        try:
+            infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        except OSError:
+            continue
+        if infos:
+            _PINNED_ADDRS[(host, port)] = infos[0][4][0]
 
+
+def _connect_pinned(ip: str, address: Tuple[str, int], *args, **kwargs) -> socket.socket:
     try:
-        data = json.loads(body.decode("utf-8", errors="ignore"))
-    except Exception:
-        return {"resolver_error": True}
+        return socket.create_connection((ip, address[1]), *args, **kwargs)
+    except OSError:
+        # The pinned address went bad; fall back to resolving the name again.
+        return socket.create_connection(address, *args, **kwargs)
+
+
+def _pooled_connection(scheme: str, netloc: str, timeout: float) -> http.client.HTTPConnection:
+    conns = getattr(_http_local, "conns", None)
+    if conns is None:
+        conns = _http_local.conns = {}
+    conn = conns.get((scheme, netloc))
+    if conn is None:
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(netloc, timeout=timeout, context=_SSL_CONTEXT)
+        else:
+            conn = http.client.HTTPConnection(netloc, timeout=timeout)
+        pinned_ip = _PINNED_ADDRS.get((conn.host, conn.port))
+        if pinned_ip is not None:
+            # http.client opens its socket through this hook; HTTPSConnection
+            # wraps it with server_hostname=conn.host afterwards.
+            conn._create_connection = functools.partial(_connect_pinned, pinned_ip)
+        conns[(scheme, netloc)] = conn
+    elif conn.timeout != timeout:
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+    return conn
+
+
+def _drop_pooled_connection(scheme: str, netloc: str) -> None:
+    conn = _http_local.conns.pop((scheme, netloc), None)
+    if conn is not None:
+        conn.close()
+
+
+def _pooled_roundtrip(
+    conn: http.client.HTTPConnection,
+    scheme: str,
+    netloc: str,
+    method: str,
+    target: str,
+    body: Optional[bytes],
+    headers: Dict[str, str],
+) -> Tuple[int, bytes]:
+    try:
+        conn.request(method, target, body=body, headers=headers)
+        resp = conn.getresponse()
+        data = resp.read()
+    except (OSError, http.client.HTTPException):
+        _drop_pooled_connection(scheme, netloc)
+        raise
+    if resp.will_close:
+        _drop_pooled_connection(scheme, netloc)
+    return resp.status, data
+
+
+# How a reused keep-alive connection fails when the server has closed it in
+# the meantime (RemoteDisconnected is the empty status line).
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+
+def _pooled_request(
+    method: str,
+    url: str,
+    body: Optional[bytes] = None,
+    headers: Dict[str, str] = _DOH_HEADERS,
+    timeout: float = _DOH_TIMEOUT_SECONDS,
+) -> Tuple[int, bytes]:
+    """Send a request to `url` over this thread's persistent connection to its host.
+
+    Returns (status, body) for any HTTP status; redirects are not followed.
+    Raises OSError / http.client.HTTPException on transport failure.
+    """
+    parsed = urllib.parse.urlsplit(url)
+    target = parsed.path or "/"
+    if parsed.query:
+        target += "?" + parsed.query
+    conn = _pooled_connection(parsed.scheme, parsed.netloc, timeout)
+    if conn.sock is not None:
+        # Reused keep-alive connection; the server may have closed it since.
+        try:
+            return _pooled_roundtrip(conn, parsed.scheme, parsed.netloc, method, target, body, headers)
+        except _STALE_CONNECTION_ERRORS:
+            # Only a connection the server dropped is retried; a timeout
+            # propagates, so a hung server costs one timeout, not two.
+            conn = _pooled_connection(parsed.scheme, parsed.netloc, timeout)
+    return _pooled_roundtrip(conn, parsed.scheme, parsed.netloc, method, target, body, headers)
+
+
+# Shared by every worker thread; httpx.Client is thread-safe and opens
+# concurrent requests to one resolver as streams on a single connection.
+# Only plain GETs go through it: batch POSTs and admin/upload calls stay on
+# the http.client pool above. It gets its own SSLContext because httpcore
+# sets ALPN ("h2") on the context it is given; on the shared _SSL_CONTEXT
+# that would make HTTP/1.1-only http.client connections offer h2 as well.
+# Its connections are not address-pinned (see _PINNED_ADDRS).
+_DOH_HTTP2_CLIENT = (
+    httpx.Client(
+        http2=True,
+        headers=_DOH_HEADERS,
+        timeout=_DOH_TIMEOUT_SECONDS,
+        verify=ssl.create_default_context(),
+        limits=httpx.Limits(max_keepalive_connections=16, max_connections=64),
+    )
+    if httpx is not None
+    else None
+)
+
+
+def _doh_get(url: str, headers: Dict[str, str] = _DOH_HEADERS) -> Tuple[int, bytes]:
+    if _DOH_HTTP2_CLIENT is None:
+        return _pooled_request("GET", url, headers=headers)
+    try:
+        resp = _DOH_HTTP2_CLIENT.get(url, headers=headers)
+    except httpx.HTTPError as e:
+        # Surface transport failures the way the http.client path does.
+        raise OSError(str(e)) from e
+    return resp.status_code, resp.content
+
+
+# ---------------------------------------------------------------------------
+# In-process DNS answer cache.
+#
+# Word mode queries the same label under every TLD and wrapped pointers can
+# revisit (label, tld) pairs, so answers are kept for the TTL the resolver
+# reported (capped at DNS_CACHE_MAX_TTL_SECONDS). Negative answers that carry
+# no TTL at all (no SOA in Authority) are kept for DNS_CACHE_NEGATIVE_TTL_SECONDS
+# instead of being re-queried. Keyed by (domain, resolver url); the OrderedDict
+# doubles as an LRU bounded at DNS_CACHE_MAX_ENTRIES. Resolver errors are never
+# cached.
+# ---------------------------------------------------------------------------
+DNS_CACHE_MAX_TTL_SECONDS = 900
+DNS_CACHE_NEGATIVE_TTL_SECONDS = 300
+DNS_CACHE_MAX_ENTRIES = 50_000
+_dns_cache: "OrderedDict[Tuple[str, str], Tuple[float, Dict]]" = OrderedDict()
+_dns_cache_lock = threading.Lock()
+
+
+def _dns_cache_get(key: Tuple[str, str]) -> Optional[Dict]:
+    with _dns_cache_lock:
+        entry = _dns_cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del _dns_cache[key]
+            return None
+        _dns_cache.move_to_end(key)
+        return entry[1]
+
+
+def _dns_cache_put(key: Tuple[str, str], data: Dict, result: Dict) -> None:
+    # TTL from the answer records; a negative answer carries its TTL on the
+    # SOA in Authority instead.
+    records = data.get("Answer") or data.get("Authority") or ()
+    ttls = [r["TTL"] for r in records if isinstance(r, dict) and isinstance(r.get("TTL"), int)]
+    if ttls:
+        ttl = min(min(ttls), DNS_CACHE_MAX_TTL_SECONDS)
+    elif not result.get("registered"):
+        ttl = DNS_CACHE_NEGATIVE_TTL_SECONDS
+    else:
+        return
+    if ttl <= 0:
+        return
+    with _dns_cache_lock:
+        _dns_cache[key] = (time.monotonic() + ttl, result)
+        _dns_cache.move_to_end(key)
+        if len(_dns_cache) > DNS_CACHE_MAX_ENTRIES:
+            _dns_cache.popitem(last=False)
+
 
+def _parse_doh_answer(data) -> Dict:
+    """Map one DNS JSON response object to the check_domain_dns result shape."""
     # Basic health: if the resolver returns malformed JSON or no Status, mark as error.
-    status_code = data.get("Status")
+    status_code = data.get("Status") if isinstance(data, dict) else None
     if status_code is None:
         return {"resolver_error": True}
 
@@ -442,77 +1014,296 @@ def check_domain_dns(domain: str, resolver: Dict) -> Dict:
     }
 
 
+def check_domain_dns(domain: str, resolver: Dict) -> Dict:
+    """DNS/registration check using DNS-over-HTTPS.
+
+    resolver is a dict with at least a 'url' key. Healthy answers are served
+    from the in-process DNS cache while their TTL lasts.
+    """
+    cache_key = (domain, resolver["url"])
+    cached = _dns_cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    wire = resolver.get("format") == "wire"
+
+    try:
+        if wire:
+            status, body = _doh_get(build_doh_wire_url(resolver["url"], domain), _DOH_WIRE_HEADERS)
+        else:
+            status, body = _doh_get(build_doh_url(resolver["url"], domain))
+    except (OSError, http.client.HTTPException, UnicodeError):
+        # OSError covers socket.timeout, ssl.SSLError and connection resets.
+        return {"resolver_error": True}
+    if status != 200:
+        return {"resolver_error": True}
+
+    try:
+        data = parse_doh_wire(body) if wire else _json_loads(body)
+    except Exception:
+        return {"resolver_error": True}
+
+    result = _parse_doh_answer(data)
+    if not result["resolver_error"]:
+        _dns_cache_put(cache_key, data, result)
+    return result
+
+
+# Resolvers whose config carries a "batch_path" (e.g. a dnsproxy-style batch
+# endpoint) accept several A queries per POST as
+# {"queries": [{"domain": ..., "type": "A"}, ...]} and answer with a JSON array
+# of DNS JSON objects in the same order. run() groups lookups this many at a time.
+DNS_BATCH_SIZE = 10
+_DOH_BATCH_HEADERS = {
+    "Accept": "application/json",
+    "Content-Type": "application/json",
+    "User-Agent": "dom4in-collector/1.0",
+}
+
+
+def check_domain_dns_batch(domains: Sequence[str], resolver: Dict) -> List[Dict]:
+    """check_domain_dns for several domains in one request to the resolver's batch endpoint.
+
+    Returns one result per domain, in order. Answers still cached in-process
+    are not re-queried; if the request itself fails every uncached domain
+    comes back as a resolver error.
+    """
+    return _dns_batch_query(domains, resolver)[0]
+
+
+def _dns_batch_query(domains: Sequence[str], resolver: Dict) -> Tuple[List[Dict], Optional[bool]]:
+    """check_domain_dns_batch, plus whether its one request succeeded
+    (None when every domain was answered from the cache and nothing was sent)."""
+    results: List[Optional[Dict]] = [_dns_cache_get((d, resolver["url"])) for d in domains]
+    pending = [i for i, r in enumerate(results) if r is None]
+    request_ok = None
+    if pending:
+        url = urllib.parse.urljoin(resolver["url"], resolver["batch_path"])
+        body = _json_bytes({"queries": [{"domain": domains[i], "type": "A"} for i in pending]})
+        answers = None
+        try:
+            status, raw = _pooled_request("POST", url, body, _DOH_BATCH_HEADERS)
+            if status == 200:
+                answers = _json_loads(raw)
+        except (OSError, http.client.HTTPException, ValueError):
+            answers = None
+        request_ok = isinstance(answers, list) and len(answers) == len(pending)
+        if not request_ok:
+            answers = [None] * len(pending)
+
+        for i, data in zip(pending, answers):
+            result = _parse_doh_answer(data)
+            if not result["resolver_error"]:
+                _dns_cache_put((domains[i], resolver["url"]), data, result)
+            results[i] = result
+    return results, request_ok
+
+
+# usage_state classification. check_domain_http reports both the name (for logs
+# and the lookup cache) and the small-int id; aggregation only reads the id.
+USAGE_NO_WEBSITE, USAGE_PARKED, USAGE_ACTIVE_SITE, USAGE_UNKNOWN = 0, 1, 2, 3
+USAGE_STATE_NAMES = ("no_website", "parked_or_placeholder", "active_site", "unknown")
+# Indexed by usage_state_id: does a registered domain in this state count as unused?
+USAGE_IS_UNUSED = (True, True, False, False)
+
+
+def usage_info(usage_state_id: int, product_state: str = "unknown") -> Dict:
+    return {
+        "usage_state": USAGE_STATE_NAMES[usage_state_id],
+        "usage_state_id": usage_state_id,
+        "product_state": product_state,
+    }
+
+
+# Keyword checks for check_domain_http, run straight on the (undecoded) body
+# snippet: one case-insensitive pass per list instead of one substring scan
+# per keyword. All keywords are ASCII, so bytes matching loses nothing.
+_PARKED_RE = re.compile(rb"domain parking|parked domain|this domain is for sale", re.IGNORECASE)
+_PRODUCT_RE = re.compile(rb"pricing|plans|subscribe|sign up|buy now|api docs|api documentation", re.IGNORECASE)
+
+
+# Built once: urlopen(..., context=...) assembles a fresh opener and handler
+# chain on every call. Every probe goes to a different host, so there is no
+# connection to keep alive here; the opener is what can be shared. The HTTPS
+# handler gets the shared _SSL_CONTEXT, since without one http.client builds
+# (and loads the CA store into) a new SSLContext for every connection.
+_HTTP_OPENER = urllib.request.build_opener(urllib.request.HTTPSHandler(context=_SSL_CONTEXT))
+
+# How much of a page check_domain_http classifies. A 416 for the Range (an
+# empty resource) lands in the HTTPError branch, i.e. no website.
+HTTP_BODY_SNIPPET_BYTES = 4096
+_HTTP_PROBE_HEADERS = {
+    "User-Agent": "dom4in-collector/1.0",
+    "Range": f"bytes=0-{HTTP_BODY_SNIPPET_BYTES - 1}",
+}
+
+
 def check_domain_http(domain: str) -> Dict:
     """Simple HTTP/product check using urllib.
 
     Only called for domains that appear registered.
+
+    A single GET, deliberately not HEAD-then-GET: urlopen raises HTTPError on a
+    4xx/5xx before any of the body is read, so error responses already cost no
+    body transfer, while a HEAD probe would add a round trip to every live site.
+    Only the first HTTP_BODY_SNIPPET_BYTES are asked for (servers may answer
+    206 with just that range) and read, and a non-text body is not read at all.
     """
     url = f"https://{domain}"
-    req = urllib.request.Request(url, headers={"User-Agent": "dom4in-collector/1.0"})
+    req = urllib.request.Request(url, headers=_HTTP_PROBE_HEADERS)
 
     try:
-        ctx = ssl.create_default_context()
-        with urllib.request.urlopen(req, timeout=5, context=ctx) as resp:
+        with _HTTP_OPENER.open(req, timeout=5) as resp:
             status = resp.getcode() or 0
             content_type = resp.headers.get("Content-Type", "")
-            body = resp.read(4096)  # read up to 4KB
+            if content_type and not content_type.lower().startswith("text/"):
+                body = b""
+            else:
+                body = resp.read(HTTP_BODY_SNIPPET_BYTES)
+    except urllib.error.HTTPError as e:
+        # Close now rather than at garbage collection so the unread body and
+        # its socket are released immediately.
+        e.close()
+        return usage_info(USAGE_NO_WEBSITE)
     except (urllib.error.URLError, socket.timeout, ssl.SSLError, Exception):
         # Any network/HTTP error, including RemoteDisconnected, is treated as no website.
-        return {
-            "usage_state": "no_website",
-            "product_state": "unknown",
-        }
-
-    text_snippet = ""
-    if isinstance(body, bytes):
-        try:
-            text_snippet = body.decode("utf-8", errors="ignore")
-        except Exception:
-            text_snippet = ""
+        return usage_info(USAGE_NO_WEBSITE)
 
-    text_lower = text_snippet.lower()
+    if not isinstance(body, bytes):
+        body = b""
 
     # Basic usage classification
     if status >= 500:
-        usage_state = "no_website"
-    elif any(keyword in text_lower for keyword in ["domain parking", "parked domain", "this domain is for sale"]):
-        usage_state = "parked_or_placeholder"
+        usage_state_id = USAGE_NO_WEBSITE
+    elif _PARKED_RE.search(body):
+        usage_state_id = USAGE_PARKED
     elif status in (301, 302, 303, 307, 308):
-        usage_state = "parked_or_placeholder"
-    elif "text/html" in content_type and len(text_snippet.strip()) > 0:
-        usage_state = "active_site"
+        usage_state_id = USAGE_PARKED
+    elif "text/html" in content_type and body.strip():
+        usage_state_id = USAGE_ACTIVE_SITE
     else:
-        usage_state = "no_website"
+        usage_state_id = USAGE_NO_WEBSITE
 
     # Very rough product detection
-    product_keywords = ["pricing", "plans", "subscribe", "sign up", "buy now", "api docs", "api documentation"]
-    product_state = "active_product" if any(k in text_lower for k in product_keywords) else "unknown"
+    product_state = "active_product" if _PRODUCT_RE.search(body) else "unknown"
 
-    return {
-        "usage_state": usage_state,
-        "product_state": product_state,
-    }
+    return usage_info(usage_state_id, product_state)
+
+
+# ---------------------------------------------------------------------------
+# Cross-run lookup cache.
+#
+# Optional (--cache-ttl) sqlite cache of DNS/HTTP check results keyed by
+# (domain, kind). Word mode wraps around its list and re-checks the same
+# domains, so repeat checks inside the TTL become a local read instead of a
+# network round trip. Negative results (no DNS / no website) are capped at
+# NEGATIVE_CACHE_TTL_SECONDS since those flip to registered far more often
+# than the reverse. Resolver errors are never cached.
+# ---------------------------------------------------------------------------
+NEGATIVE_CACHE_TTL_SECONDS = 24 * 3600
+
+
+def lookup_cache_path(shard_id: int = 0, shard_count: int = 1) -> str:
+    """sqlite file for a shard; shards get their own so they never contend for its lock."""
+    if shard_count <= 1:
+        return LOOKUP_CACHE_FILE
+    return os.path.join(BASE_DIR, f"state_lookup_cache.shard{shard_id}of{shard_count}.sqlite3")
+
+
+class LookupCache:
+    """sqlite-backed (domain, kind) -> result cache. Safe to share across the
+    worker threads in run(); writes are committed by commit() once per block."""
+
+    def __init__(self, path: str, ttl_seconds: int) -> None:
+        self._ttl = ttl_seconds
+        self._negative_ttl = min(ttl_seconds, NEGATIVE_CACHE_TTL_SECONDS)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS lookup_cache ("
+            "domain TEXT NOT NULL, kind TEXT NOT NULL, result TEXT NOT NULL, "
+            "expires_at INTEGER NOT NULL, PRIMARY KEY (domain, kind))"
+        )
+        self._conn.execute("DELETE FROM lookup_cache WHERE expires_at <= ?", (int(time.time()),))
+        self._conn.commit()
+
+    def get(self, domain: str, kind: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM lookup_cache WHERE domain = ? AND kind = ? AND expires_at > ?",
+                (domain, kind, int(time.time())),
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return _json_loads(row[0])
+        except ValueError:
+            return None
+
+    def put(self, domain: str, kind: str, result: Dict, positive: bool) -> None:
+        ttl = self._ttl if positive else self._negative_ttl
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO lookup_cache (domain, kind, result, expires_at) VALUES (?, ?, ?, ?)",
+                (domain, kind, _json_bytes(result).decode("utf-8"), int(time.time()) + ttl),
+            )
+
+    def commit(self) -> None:
+        with self._lock:
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
 
 
 # --- Aggregation ---
 
+# Counters are plain lists addressed by these slot indices rather than small
+# string-keyed dicts; build_payload turns them back into the JSON row shape the
+# Worker expects.
+# Length rows (length_stats, length_stats_by_tld, word_pos_stats). total_possible
+# is a pure function of length, so it is filled in by build_payload instead.
+TRACKED, UNREGISTERED, UNUSED = 0, 1, 2
+# tld_stats rows:
+TLD_CHECKED, TLD_SHORT_CHECKED, TLD_SHORT_UNREGISTERED, TLD_SHORT_NO_WEBSITE, TLD_SHORT_ACTIVE_SITE = 0, 1, 2, 3, 4
+
+# Every batch draws its TLDs from Pointer.TLDS, so the per-TLD tables are
+# indexed by position in that tuple instead of hashing (tld, length) keys.
+TLD_IDS = {tld: i for i, tld in enumerate(Pointer.TLDS)}
+
 
 def init_aggregates() -> Dict:
+    # There is no "global" table: every checked domain lands in exactly one
+    # tld_stats row, so build_payload derives the global counts from those.
     return {
-        "global": {
-            "domains_tracked_lifetime": 0,
-            "domains_tracked_24h": 0,
-        },
-        "length_stats": {},  # key: length -> counters (ALL TLDs)
-        "length_stats_by_tld": {},  # key: (tld, length) -> counters
-        "tld_stats": {},     # key: tld -> counters (for future use)
+        # index: [tld_id][length] -> counters. The ALL-TLDs length_stats rows
+        # are the per-length sums of this table, computed in build_payload.
+        "length_stats_by_tld": [
+            [[0, 0, 0] for _ in range(MAX_LENGTH + 1)] for _ in Pointer.TLDS
+        ],
+        # index: tld_id -> counters (for future use)
+        "tld_stats": [[0, 0, 0, 0, 0] for _ in Pointer.TLDS],
         "word_pos_stats": {},  # key: (pos, length) -> counters
     }
 
 
+def reset_aggregates(aggr: Dict) -> None:
+    """Zero every counter in `aggr` in place, so one set of tables from
+    init_aggregates() can be reused block after block."""
+    for by_length in aggr["length_stats_by_tld"]:
+        for c in by_length:
+            c[TRACKED] = c[UNREGISTERED] = c[UNUSED] = 0
+    for ts in aggr["tld_stats"]:
+        ts[:] = (0,) * len(ts)
+    aggr["word_pos_stats"].clear()
+
+
 def update_aggregates(
-    aggr: Dict,
-    domain: str,
+    length_stats_by_tld: List,
+    tld_stats: List,
+    word_pos_stats: Dict,
     tld: str,
     length: int,
     dns_info: Dict,
@@ -520,88 +1311,49 @@ def update_aggregates(
     track_length_stats: bool = True,
     word_pos_label: str = "",
 ) -> None:
-    g = aggr["global"]
-    g["domains_tracked_lifetime"] += 1
-    g["domains_tracked_24h"] += 1
-
-    if track_length_stats:
-        # Overall (ALL TLDs) length bucket
-        ls = aggr["length_stats"].setdefault(length, {
-            "length": length,
-            "total_possible": len(CHARSET) ** length,
-            "tracked_count": 0,
-            "unregistered_found": 0,
-            "unused_found": 0,
-        })
-
-        ls["tracked_count"] += 1
+    """Count one checked domain into a block's aggregate tables.
 
-        if not dns_info.get("registered"):
-            ls["unregistered_found"] += 1
-        else:
-            usage_state = http_info.get("usage_state")
-            if usage_state in {"no_website", "parked_or_placeholder"}:
-                ls["unused_found"] += 1
+    Called once per domain, so it takes the tables from init_aggregates()
+    directly; the caller unpacks them once per block.
+    """
+    registered = dns_info.get("registered")
+    usage_state_id = http_info.get("usage_state_id", USAGE_UNKNOWN)
+    unused = USAGE_IS_UNUSED[usage_state_id]
+    tld_id = TLD_IDS[tld]
 
+    if track_length_stats:
         # Per-TLD length bucket
-        key_tld = (tld, length)
-        lts = aggr["length_stats_by_tld"].setdefault(key_tld, {
-            "tld": tld,
-            "length": length,
-            "total_possible": len(CHARSET) ** length,
-            "tracked_count": 0,
-            "unregistered_found": 0,
-            "unused_found": 0,
-        })
+        lts = length_stats_by_tld[tld_id][length]
+        lts[TRACKED] += 1
 
-        lts["tracked_count"] += 1
+        if not registered:
+            lts[UNREGISTERED] += 1
+        elif unused:
+            lts[UNUSED] += 1
 
-        if not dns_info.get("registered"):
-            lts["unregistered_found"] += 1
-        else:
-            usage_state = http_info.get("usage_state")
-            if usage_state in {"no_website", "parked_or_placeholder"}:
-                lts["unused_found"] += 1
-
-    ts = aggr["tld_stats"].setdefault(tld, {
-        "tld": tld,
-        "domains_checked_total": 0,
-        "short_domains_checked_total": 0,
-        "short_unregistered_count": 0,
-        "short_no_website_count": 0,
-        "short_active_site_count": 0,
-    })
-
-    ts["domains_checked_total"] += 1
+    ts = tld_stats[tld_id]
+    ts[TLD_CHECKED] += 1
     if length <= MAX_LENGTH:
-        ts["short_domains_checked_total"] += 1
-        if not dns_info.get("registered"):
-            ts["short_unregistered_count"] += 1
-        else:
-            usage_state = http_info.get("usage_state")
-            if usage_state in {"no_website", "parked_or_placeholder"}:
-                ts["short_no_website_count"] += 1
-            elif usage_state == "active_site":
-                ts["short_active_site_count"] += 1
+        ts[TLD_SHORT_CHECKED] += 1
+        if not registered:
+            ts[TLD_SHORT_UNREGISTERED] += 1
+        elif unused:
+            ts[TLD_SHORT_NO_WEBSITE] += 1
+        elif usage_state_id == USAGE_ACTIVE_SITE:
+            ts[TLD_SHORT_ACTIVE_SITE] += 1
 
     if word_pos_label:
         key = (word_pos_label, length)
-        wps = aggr["word_pos_stats"].setdefault(key, {
-            "pos": word_pos_label,
-            "length": length,
-            "tracked_count": 0,
-            "unregistered_found": 0,
-            "unused_found": 0,
-        })
+        wps = word_pos_stats.get(key)
+        if wps is None:
+            wps = word_pos_stats[key] = [0, 0, 0]
 
-        wps["tracked_count"] += 1
+        wps[TRACKED] += 1
 
-        if not dns_info.get("registered"):
-            wps["unregistered_found"] += 1
-        else:
-            usage_state = http_info.get("usage_state")
-            if usage_state in {"no_website", "parked_or_placeholder"}:
-                wps["unused_found"] += 1
+        if not registered:
+            wps[UNREGISTERED] += 1
+        elif unused:
+            wps[UNUSED] += 1
 
 
 def build_payload(
@@ -610,20 +1362,55 @@ def build_payload(
     run_id: Optional[str] = None,
     batch_id: Optional[str] = None,
 ) -> Dict:
-    length_stats_list = sorted(aggr["length_stats"].values(), key=lambda x: x["length"])
-    length_stats_by_tld_list = sorted(
-        aggr["length_stats_by_tld"].values(),
-        key=lambda x: (x["tld"], x["length"]),
-    )
-    word_pos_stats_list = sorted(
-        aggr["word_pos_stats"].values(),
-        key=lambda x: (x["pos"], x["length"]),
-    )
+    # The indexed tables come out in (tld, length) order; word_pos_stats rows
+    # are emitted in insertion order. The Worker upserts each row on its own
+    # key, so sorting them here would buy nothing.
+    # ALL-TLDs rows: column sums of the per-TLD table for each length.
+    length_totals = [[sum(col) for col in zip(*rows)] for rows in zip(*aggr["length_stats_by_tld"])]
+    length_stats_list = [
+        {
+            "length": length,
+            "total_possible": TOTAL_BY_LENGTH[length],
+            "tracked_count": c[TRACKED],
+            "unregistered_found": c[UNREGISTERED],
+            "unused_found": c[UNUSED],
+        }
+        for length, c in enumerate(length_totals)
+        if c[TRACKED]
+    ]
+    length_stats_by_tld_list = [
+        {
+            "tld": tld,
+            "length": length,
+            "total_possible": TOTAL_BY_LENGTH[length],
+            "tracked_count": c[TRACKED],
+            "unregistered_found": c[UNREGISTERED],
+            "unused_found": c[UNUSED],
+        }
+        for tld, by_length in zip(Pointer.TLDS, aggr["length_stats_by_tld"])
+        for length, c in enumerate(by_length)
+        if c[TRACKED]
+    ]
+    word_pos_stats_list = [
+        {
+            "pos": pos,
+            "length": length,
+            "tracked_count": c[TRACKED],
+            "unregistered_found": c[UNREGISTERED],
+            "unused_found": c[UNUSED],
+        }
+        for (pos, length), c in aggr["word_pos_stats"].items()
+    ]
+
+    tracked = sum(ts[TLD_CHECKED] for ts in aggr["tld_stats"])
 
     # tld_stats can be added later to the upload payload when the Worker supports it
     payload = {
         "date": date_str,
-        "global": aggr["global"],
+        "global": {
+            "domains_tracked_lifetime": tracked,
+            "domains_tracked_24h": tracked,
+        },
         "length_stats": length_stats_list,
         "length_stats_by_tld": length_stats_by_tld_list,
         "word_pos_stats": word_pos_stats_list,
@@ -641,10 +1428,20 @@ def build_payload(
 
 # --- Upload stub ---
 
+# Upload bodies at least this large are sent gzip-compressed; the row-per-
+# (tld, length) JSON repeats the same keys and compresses several-fold, while
+# tiny bodies are not worth the CPU or the gzip header.
+UPLOAD_GZIP_MIN_BYTES = 1024
+
 
 def upload_aggregate(api_base: str, api_key: str, payload: Dict, dry_run: bool = False) -> Tuple[int, str]:
     """Call the Worker admin endpoint (or just print in dry-run mode).
 
+    Sent over the keep-alive pool (_pooled_request), like the other admin
+    calls: redirects are not followed and proxy environment variables are
+    not honoured. A stale keep-alive connection is retried once; the
+    Worker drops a replayed (run_id, batch_id), so that cannot double-count.
+
     Returns a tuple of (status_code, body_text) for logging.
     """
     url = f"{api_base.rstrip('/')}/api/admin/upload-aggregate"
@@ -654,31 +1451,27 @@ def upload_aggregate(api_base: str, api_key: str, payload: Dict, dry_run: bool =
         print(json.dumps(payload, indent=2))
         return 0, "dry-run"
 
-    data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(
-        url,
-        data=data,
-        headers={
-            "Content-Type": "application/json",
-            "x-admin-api-key": api_key,
-            "User-Agent": "dom4in-collector/1.0",
-        },
-        method="POST",
-    )
+    data = _json_bytes(payload)
+    headers = {
+        "Content-Type": "application/json",
+        "x-admin-api-key": api_key,
+        "User-Agent": "dom4in-collector/1.0",
+    }
+    if len(data) >= UPLOAD_GZIP_MIN_BYTES:
+        data = gzip.compress(data, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
 
     try:
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            body = resp.read()
-            text = body.decode("utf-8", errors="ignore")
-            print(f"[upload_aggregate] Status {resp.status}: {text}")
-            return resp.status, text
-    except urllib.error.HTTPError as e:
-        text = e.read().decode("utf-8", errors="ignore")
-        print(f"[upload_aggregate] HTTP error {e.code}: {text}")
-        return e.code, text
-    except urllib.error.URLError as e:
+        status, body = _pooled_request("POST", url, data, headers, timeout=10)
+    except (OSError, http.client.HTTPException) as e:
         print(f"[upload_aggregate] URL error: {e}")
         return 0, str(e)
+    text = body.decode("utf-8", errors="ignore")
+    if status >= 400:
+        print(f"[upload_aggregate] HTTP error {status}: {text}")
+    else:
+        print(f"[upload_aggregate] Status {status}: {text}")
+    return status, text
 
 
 # ---------------------------------------------------------------------------
@@ -701,6 +1494,9 @@ def log_json(event: str, **fields) -> None:
 
 # ---------------------------------------------------------------------------
 # Admin HTTP helpers — state + runs endpoints.
+#
+# These share the keep-alive pool with upload_aggregate, so they have the same
+# limits: no redirects, no HTTPS_PROXY. main() warns when a proxy is set.
 # ---------------------------------------------------------------------------
 def _admin_request(method: str, url: str, api_key: str, body: Optional[Dict] = None, timeout: int = 10) -> Tuple[int, str]:
     data = None
@@ -709,18 +1505,13 @@ def _admin_request(method: str, url: str, api_key: str, body: Optional[Dict] = N
         "User-Agent": "dom4in-collector/1.0",
     }
     if body is not None:
-        data = json.dumps(body).encode("utf-8")
+        data = _json_bytes(body)
         headers["Content-Type"] = "application/json"
-    req = urllib.request.Request(url, data=data, headers=headers, method=method)
     try:
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            text = resp.read().decode("utf-8", errors="ignore")
-            return resp.status, text
-    except urllib.error.HTTPError as e:
-        text = e.read().decode("utf-8", errors="ignore")
-        return e.code, text
-    except urllib.error.URLError as e:
+        status, raw = _pooled_request(method, url, data, headers, timeout=timeout)
+    except (OSError, http.client.HTTPException) as e:
         return 0, str(e)
+    return status, raw.decode("utf-8", errors="ignore")
 
 
 def get_cloud_state(api_base: str, api_key: str, key: str) -> Optional[Dict]:
@@ -787,12 +1578,26 @@ def reset_db(api_base: str, api_key: str) -> None:
         print(f"[reset_db] URL error: {e}")
 
 
-def reset_pointer() -> None:
-    if os.path.exists(POINTER_FILE):
-        os.remove(POINTER_FILE)
-        print(f"Pointer file removed: {POINTER_FILE}")
-    else:
+# (epoch_day, "YYYY-MM-DD") for the last date utc_date_str() formatted.
+_DATE_CACHE = [-1, ""]
+
+
+def utc_date_str() -> str:
+    """Today's UTC date in ISO form, only re-formatted when the day rolls over."""
+    day = int(time.time()) // 86400
+    if day != _DATE_CACHE[0]:
+        _DATE_CACHE[:] = [day, datetime.fromtimestamp(day * 86400, tz=timezone.utc).date().isoformat()]
+    return _DATE_CACHE[1]
+
+
+def reset_pointer(shard_id: int = 0, shard_count: int = 1) -> None:
+    path = Pointer.local_path(shard_id, shard_count)
+    try:
+        os.remove(path)
+    except FileNotFoundError:
         print("Pointer file does not exist; nothing to reset.")
+    else:
+        print(f"Pointer file removed: {path}")
 
 
 def run(
@@ -807,6 +1612,11 @@ def run(
     run_id: Optional[str] = None,
     max_duration_seconds: int = 0,
     max_blocks: int = 0,
+    cache_ttl_hours: int = 0,
+    checkpoint_every: int = 1,
+    shard_id: int = 0,
+    shard_count: int = 1,
+    block_size: int = 0,
 ) -> Dict:
     """Main collection loop.
 
@@ -818,6 +1628,19 @@ def run(
       - max_blocks > 0  → stop cleanly after N blocks; status=success.
       - max_duration_seconds > 0 → wall-clock cap; status=partial.
       - Neither set → run until pointer space is exhausted.
+
+    cache_ttl_hours > 0 enables the cross-run LookupCache for DNS/HTTP results.
+
+    checkpoint_every > 1 saves the pointers only every N blocks. Whatever is
+    pending is flushed when the loop exits, including on an exception or
+    SIGTERM (up to the last finished block); a hard kill can replay (and
+    re-upload) up to N-1 blocks. The SIGTERM handler is restored on return.
+
+    shard_count > 1 restricts short mode to label indices with
+    index % shard_count == shard_id, using that shard's own pointer.
+
+    block_size > 0 gives every block exactly that many domains instead of a
+    random BLOCK_SIZE_MIN..BLOCK_SIZE_MAX.
     """
     run_started_monotonic = time.monotonic()
     summary = {
@@ -828,7 +1651,7 @@ def run(
         "timed_out": False,
         "status": "success",
     }
-    pointer = Pointer.load()
+    pointer = Pointer.load(shard_id, shard_count)
     word_pointer = WordPointer.load()
 
     try:
@@ -839,20 +1662,21 @@ def run(
     # Load DNS resolvers (from config if available, else defaults)
     config_resolvers = []
     per_request_delay_ms = 0
-    if os.path.exists(CONFIG_FILE):
-        try:
-            with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-                cfg = json.load(f)
-            config_resolvers = cfg.get("dns_resolvers", [])
-            per_request_delay_ms = int(cfg.get("per_request_delay_ms", 0))
-        except Exception:
-            config_resolvers = []
-            per_request_delay_ms = 0
+    try:
+        with open(CONFIG_FILE, "r", encoding="utf-8") as f:
+            cfg = json.load(f)
+        config_resolvers = cfg.get("dns_resolvers", [])
+        per_request_delay_ms = int(cfg.get("per_request_delay_ms", 0))
+    except Exception:
+        # Missing or unreadable config: use the defaults.
+        config_resolvers = []
+        per_request_delay_ms = 0
 
     resolvers = config_resolvers or DEFAULT_DNS_RESOLVERS
     if not resolvers:
         print("Error: no DNS resolvers configured.")
         return
+    pin_resolver_addresses(resolvers)
 
     # Per-resolver pacing and simple error tracking so we don't hammer a single endpoint
     # even when using many worker threads.
@@ -869,203 +1693,355 @@ def run(
                 "last_used_ms": 0,
                 "ok": 0,
                 "err": 0,
+                # Exponentially weighted success latency and error rate, used
+                # to rank resolvers in pick_resolver. ewma_ms is seeded by the
+                # first successful query.
+                "ewma_ms": 100.0,
+                "ewma_err": 0.1,
+                # Consecutive errors, and until when the breaker keeps the
+                # resolver out of rotation (see record_resolver_result).
+                "fails": 0,
+                "broken_until_ms": 0,
             }
         )
 
     # Normalize worker count (0 = single-threaded behavior)
     worker_count = max(0, int(workers or 0))
 
-    def pick_resolver() -> Tuple[Dict, int]:
-        """Pick a resolver respecting per-resolver min_delay_ms as best we can.
-
-        Returns (resolver_dict, index_in_resolvers).
+    # Resolvers inside their min_delay_ms window wait in `cooling`, a min-heap
+    # of (next_available_ms, idx); the others are in `ready`. pick_resolver takes
+    # the best-scoring ready resolver, where the score is the latency EWMA
+    # inflated by the error-rate EWMA. Shared by all worker threads, hence the lock.
+    ready = list(range(len(resolvers)))
+    cooling: List[Tuple[int, int]] = []
+    resolver_lock = threading.Lock()
+
+    def resolver_score(idx: int) -> float:
+        state = resolver_state[idx]
+        if not state["ok"] and not state["err"]:
+            # Never tried: rank first so every resolver gets measured.
+            return -1.0
+        return state["ewma_ms"] * (1 + RESOLVER_ERROR_PENALTY * state["ewma_err"])
+
+    def pick_resolver(exclude: Sequence[int] = ()) -> Tuple[Dict, int]:
+        """Pick the fastest healthy resolver that is not cooling down.
+
+        Returns (resolver_dict, index_in_resolvers). Resolvers in `exclude` (the
+        ones already tried for the current domain) and resolvers whose circuit
+        breaker is open are skipped while any other is ready. When every ready
+        resolver was already tried, the untried one that frees up first is
+        taken from `cooling` before a tried one is reused. If every resolver
+        is cooling down, the one that frees up first is returned anyway.
         """
-        now = now_ms()
-        chosen_idx = None
-
-        # First pass: prefer any resolver whose min delay window has elapsed
-        for idx, state in enumerate(resolver_state):
-            min_delay = state["min_delay_ms"]
-            last_used = state["last_used_ms"]
-            if min_delay <= 0 or now - last_used >= min_delay:
-                chosen_idx = idx
+        with resolver_lock:
+            now = now_ms()
+            while cooling and cooling[0][0] <= now:
+                ready.append(heapq.heappop(cooling)[1])
+
+            candidates = [idx for idx in ready if idx not in exclude]
+            untried_cooling = None
+            if not candidates and exclude:
+                untried_cooling = min((e for e in cooling if e[1] not in exclude), default=None)
+
+            if untried_cooling is not None:
+                cooling.remove(untried_cooling)
+                heapq.heapify(cooling)
+                next_available, chosen_idx = untried_cooling
+            elif ready:
+                candidates = [
+                    idx for idx in candidates if resolver_state[idx]["broken_until_ms"] <= now
+                ] or candidates or ready
+                chosen_idx = min(candidates, key=resolver_score)
+                next_available = now
+            else:
+                next_available, chosen_idx = heapq.heappop(cooling)
+
+            state = resolver_state[chosen_idx]
+            state["last_used_ms"] = now
+            if state["min_delay_ms"] > 0:
+                if next_available == now:
+                    ready.remove(chosen_idx)
+                heapq.heappush(cooling, (max(now, next_available) + state["min_delay_ms"], chosen_idx))
+        return resolvers[chosen_idx], chosen_idx
+
+    def record_resolver_result(idx: int, ok: bool, rtt_ms: Optional[float] = None) -> None:
+        with resolver_lock:
+            state = resolver_state[idx]
+            if ok:
+                if rtt_ms is not None:
+                    if state["ok"]:
+                        state["ewma_ms"] += RESOLVER_EWMA_ALPHA * (rtt_ms - state["ewma_ms"])
+                    else:
+                        state["ewma_ms"] = rtt_ms
+                state["ok"] += 1
+                state["fails"] = 0
+            else:
+                state["err"] += 1
+                state["fails"] += 1
+                backoff_s = min(RESOLVER_BREAKER_MAX_SECONDS, 2 ** min(state["fails"], 6))
+                state["broken_until_ms"] = now_ms() + backoff_s * 1000
+            state["ewma_err"] += RESOLVER_EWMA_ALPHA * ((0.0 if ok else 1.0) - state["ewma_err"])
+
+    lookup_cache = (
+        LookupCache(lookup_cache_path(shard_id, shard_count), cache_ttl_hours * 3600)
+        if cache_ttl_hours > 0
+        else None
+    )
+
+    def resolve_domain(domain: str) -> Dict:
+        # Try up to len(resolvers) different resolvers for this domain, respecting
+        # per-resolver delay as best we can.
+        dns_info = {"resolver_error": True}
+        tried: List[int] = []
+        for _ in range(len(resolvers)):
+            resolver, idx = pick_resolver(tried)
+            tried.append(idx)
+            # A cached answer involves no query, so it says nothing about the
+            # resolver's latency or health and is not recorded.
+            cached = _dns_cache_get((domain, resolver["url"]))
+            if cached is not None:
+                dns_info = cached
+                break
+            started = time.perf_counter()
+            dns_info = check_domain_dns(domain, resolver)
+            ok = not dns_info.get("resolver_error")
+            record_resolver_result(idx, ok, (time.perf_counter() - started) * 1000)
+            if ok:
                 break
 
-        # Fallback: if all are still "cooling down", just pick the first one
-        if chosen_idx is None:
-            chosen_idx = 0
+        if dns_info.get("resolver_error"):
+            # All resolvers failed for this domain in this attempt; treat as no DNS
+            dns_info = {"registered": False, "has_dns": False, "resolver_error": True}
+            print(f"All resolvers errored for {domain}; treating as no DNS.")
+        elif lookup_cache is not None:
+            lookup_cache.put(domain, "dns", dns_info, positive=bool(dns_info.get("registered")))
+        return dns_info
 
-        resolver_state[chosen_idx]["last_used_ms"] = now
-        return resolvers[chosen_idx], chosen_idx
+    # Resolvers with a batch endpoint (see check_domain_dns_batch). When any are
+    # configured, each block's lookups go to them DNS_BATCH_SIZE at a time first.
+    batch_resolver_idxs = [idx for idx, r in enumerate(resolvers) if r.get("batch_path")]
+
+    def prefetch_dns(domains: List[str]) -> Dict[str, Dict]:
+        """Resolve `domains` through the batch-capable resolvers.
+
+        Returns only the healthy answers (including lookup-cache hits); anything
+        missing is left to resolve_domain's per-domain path.
+        """
+        found: Dict[str, Dict] = {}
+        todo = []
+        for domain in domains:
+            cached = lookup_cache.get(domain, "dns") if lookup_cache is not None else None
+            if cached is not None:
+                found[domain] = cached
+            else:
+                todo.append(domain)
+        groups = [todo[i:i + DNS_BATCH_SIZE] for i in range(0, len(todo), DNS_BATCH_SIZE)]
+
+        def resolve_group(group_index: int) -> Tuple[int, List[Dict], Optional[bool]]:
+            idx = batch_resolver_idxs[group_index % len(batch_resolver_idxs)]
+            return (idx, *_dns_batch_query(groups[group_index], resolvers[idx]))
+
+        if executor is not None:
+            group_results = executor.map(resolve_group, range(len(groups)))
+        else:
+            group_results = map(resolve_group, range(len(groups)))
+        for group, (idx, results, request_ok) in zip(groups, group_results):
+            # One result per request sent, not per domain in it, so a single
+            # failed POST counts as one error. No latency sample: a batch
+            # round-trip isn't comparable to a single query.
+            if request_ok is not None:
+                record_resolver_result(idx, request_ok)
+            for domain, dns_info in zip(group, results):
+                if dns_info.get("resolver_error"):
+                    continue
+                found[domain] = dns_info
+                if lookup_cache is not None:
+                    lookup_cache.put(domain, "dns", dns_info, positive=bool(dns_info.get("registered")))
+        return found
 
     # Default mode: if neither flag is set, behave as "short" mode
     if not use_short and not use_words:
         use_short = True
 
+    # One set of aggregate tables for the whole run, zeroed at the start of
+    # each block; update_aggregates takes the tables directly.
+    aggr = init_aggregates()
+    length_stats_by_tld = aggr["length_stats_by_tld"]
+    tld_stats = aggr["tld_stats"]
+    word_pos_stats = aggr["word_pos_stats"]
+
     # Alternate between short and words when both are enabled
     next_mode = "short" if use_short else "words"
     block_index = 0
-    # Round-robin index for choosing lengths in short mode
+    # Round-robin index for choosing lengths in short mode, over the sorted
+    # lengths not yet marked done. Only generate_batch_for_length sets "done",
+    # so the list is built once and pruned as lengths finish.
     next_length_rr_index = 0
+    unfinished_lengths = pointer.unfinished_lengths()
+
+    # One pool for the whole run rather than one per block, so worker threads
+    # are started once and stay warm between blocks.
+    executor = ThreadPoolExecutor(max_workers=worker_count) if worker_count > 0 else None
+
+    checkpoint_every = max(1, int(checkpoint_every or 1))
+    blocks_since_checkpoint = 0
+
+    # Pointer state as of the last finished block. The generators advance the
+    # live pointers before a block is checked and uploaded, so checkpoints
+    # write these snapshots: an interrupted block is redone on the next run
+    # rather than saved as done.
+    completed_state = [pointer.snapshot(), asdict(word_pointer)]
+
+    def mark_block_completed() -> None:
+        completed_state[:] = [pointer.snapshot(), asdict(word_pointer)]
+
+    # Per-block checkpoints skip fsync: os.replace already rules out torn files
+    # on a process crash, and the last checkpoint of the run is made durable.
+    def flush_checkpoint(durable: bool = False) -> None:
+        nonlocal blocks_since_checkpoint
+        pointer_state, word_pointer_state = completed_state
+        pointer.save(durable, pointer_state)
+        # Sharding is short-mode only, so a shard never moves the word
+        # pointer; leaving the shared file alone keeps shards from racing on it.
+        if shard_count <= 1:
+            word_pointer.save(durable, word_pointer_state)
+        if lookup_cache is not None:
+            lookup_cache.commit()
+        blocks_since_checkpoint = 0
+
+    def flush_pending_checkpoint() -> None:
+        if blocks_since_checkpoint:
+            flush_checkpoint(durable=True)
+
+    previous_sigterm_handler = None
+    if checkpoint_every > 1:
+        # Deferred checkpoints must still land on a clean shutdown. SIGTERM
+        # (GHA cancel / job timeout) is turned into KeyboardInterrupt so main()
+        # records the run as partial and the finally below flushes the pointers.
+        previous_sigterm_handler = signal.signal(signal.SIGTERM, signal.default_int_handler)
 
-    while True:
-        # Hard wall-clock bound. We check at the start of each block so the
-        # current block either runs to completion (and uploads its partial
-        # aggregates) or doesn't start at all. The collector therefore exits
-        # cleanly with progress saved, instead of being SIGKILLed mid-upload
-        # by the GHA job timeout.
-        if max_duration_seconds > 0 and (time.monotonic() - run_started_monotonic) >= max_duration_seconds:
-            summary["timed_out"] = True
-            log_json(
-                "timeout_reached",
-                max_duration_seconds=max_duration_seconds,
-                blocks_completed=summary["blocks"],
-            )
-            print(f"[timeout] Reached max duration of {max_duration_seconds}s; stopping cleanly.")
-            break
-
-        # Block-budget check. Unlike the time cap this is a *clean* exit
-        # (no timed_out flag), so a run that hit its block budget still
-        # reports status=success.
-        if max_blocks > 0 and summary["blocks"] >= max_blocks:
-            log_json(
-                "block_budget_reached",
-                max_blocks=max_blocks,
-                blocks_completed=summary["blocks"],
-            )
-            print(f"[blocks] Reached max blocks of {max_blocks}; stopping cleanly.")
-            break
-
-        block_index += 1
-        # Start fresh aggregates for this block
-        aggr = init_aggregates()
-
-        # Pick a random block size between 25 and 80
-        block_count = random.randint(25, 80)
-
-        # Decide which generator to use for this block
-        mode_for_block = next_mode
-        if mode_for_block == "short" and not use_short and use_words:
-            mode_for_block = "words"
-        elif mode_for_block == "words" and not use_words and use_short:
-            mode_for_block = "short"
-
-        # Short blocks: iterative charset labels only, counted in length_stats.
-        # Word blocks: dictionary/POS-only, reserved for word_pos_stats (do not affect length_stats).
-        if mode_for_block == "short":
-            pointer.batch_size = block_count
-            tlds_for_block = pointer.tlds
-            current_iter_length = None
-
-            # Round-robin over unfinished lengths using per-length pointer state.
-            length_states = pointer.length_states or {}
-            unfinished_lengths = []
-            for key, st in length_states.items():
-                if st.get("done"):
-                    continue
-                try:
-                    L = int(key)
-                except (TypeError, ValueError):
-                    continue
-                if 1 <= L <= pointer.max_length:
-                    unfinished_lengths.append(L)
-
-            if unfinished_lengths:
-                unfinished_lengths.sort()
-                length_for_block = unfinished_lengths[next_length_rr_index % len(unfinished_lengths)]
-                next_length_rr_index += 1
-                current_iter_length = length_for_block
-                state = length_states[str(length_for_block)]
-                batch = generate_batch_for_length(
-                    state,
-                    length_for_block,
-                    pointer.charset,
-                    tlds_for_block,
-                    block_count,
+    try:
+        while True:
+            # Hard wall-clock bound. We check at the start of each block so the
+            # current block either runs to completion (and uploads its partial
+            # aggregates) or doesn't start at all. The collector therefore exits
+            # cleanly with progress saved, instead of being SIGKILLed mid-upload
+            # by the GHA job timeout.
+            if max_duration_seconds > 0 and (time.monotonic() - run_started_monotonic) >= max_duration_seconds:
+                summary["timed_out"] = True
+                log_json(
+                    "timeout_reached",
+                    max_duration_seconds=max_duration_seconds,
+                    blocks_completed=summary["blocks"],
                 )
-                short_variant = f"iter_len_{length_for_block}"
-            else:
-                batch = []
-                short_variant = "iter_exhausted"
-        else:
-            tlds_for_block = pointer.tlds  # reuse the same TLD set
-            batch = generate_word_batch(word_pointer, tlds_for_block, block_count)
-            short_variant = "words_mode"
-
-        if not batch:
-            print(f"----- Block {block_index} -----")
-            print("No more domains to process within current configuration.")
-            break
-
-        batch_size_for_block = len(batch)
-        # Block header
-        header = f"----- Block {block_index} start: mode={mode_for_block}"
-        if mode_for_block == "short":
-            if short_variant.startswith("iter_len_") and current_iter_length is not None:
-                header += f", length={current_iter_length}"
-            else:
-                header += f", variant={short_variant}"
-        print(header + f", batch={batch_size_for_block} domains -----")
-
-        def process_domain(domain: str, tld: str):
-            label = domain.split(".")[0]
-            length = len(label)
-
-            # Try up to len(resolvers) different resolvers for this domain, respecting
-            # per-resolver delay as best we can.
-            dns_info = {"resolver_error": True}
-            for _ in range(len(resolvers)):
-                resolver, idx = pick_resolver()
-                dns_info = check_domain_dns(domain, resolver)
-                if dns_info.get("resolver_error"):
-                    resolver_state[idx]["err"] += 1
-                    continue
-                resolver_state[idx]["ok"] += 1
+                print(f"[timeout] Reached max duration of {max_duration_seconds}s; stopping cleanly.")
                 break
 
-            if dns_info.get("resolver_error"):
-                # All resolvers failed for this domain in this attempt; treat as no DNS
-                dns_info = {"registered": False, "has_dns": False, "resolver_error": True}
-                print(f"All resolvers errored for {domain}; treating as no DNS.")
-
-            http_info = {"usage_state": "no_website", "product_state": "unknown"}
-            if dns_info.get("registered"):
-                http_info = check_domain_http(domain)
-
-            return domain, tld, label, length, dns_info, http_info
+            # Block-budget check. Unlike the time cap this is a *clean* exit
+            # (no timed_out flag), so a run that hit its block budget still
+            # reports status=success.
+            if max_blocks > 0 and summary["blocks"] >= max_blocks:
+                log_json(
+                    "block_budget_reached",
+                    max_blocks=max_blocks,
+                    blocks_completed=summary["blocks"],
+                )
+                print(f"[blocks] Reached max blocks of {max_blocks}; stopping cleanly.")
+                break
 
-        if worker_count > 0:
-            with ThreadPoolExecutor(max_workers=worker_count) as executor:
-                futures = [executor.submit(process_domain, domain, tld) for domain, tld in batch]
-                for fut in as_completed(futures):
-                    domain, tld, label, length, dns_info, http_info = fut.result()
-
-                    if print_each:
-                        print(
-                            f"{domain} -> registered={dns_info.get('registered')}, "
-                            f"has_dns={dns_info.get('has_dns')}, "
-                            f"usage={http_info.get('usage_state')}, "
-                            f"product={http_info.get('product_state')}"
-                        )
-
-                    track_lengths = mode_for_block == "short"
-                    pos_label = ""
-                    if mode_for_block == "words" and word_pos_index:
-                        pos_label = word_pos_index.get(label, "")
-                    update_aggregates(
-                        aggr,
-                        domain,
-                        tld,
-                        length,
-                        dns_info,
-                        http_info,
-                        track_length_stats=track_lengths,
-                        word_pos_label=pos_label,
+            block_index += 1
+            # Start this block's aggregates from zero
+            reset_aggregates(aggr)
+
+            # Fixed block size if requested, else a random one between 25 and 80
+            block_count = block_size or random.randint(BLOCK_SIZE_MIN, BLOCK_SIZE_MAX)
+
+            # Decide which generator to use for this block
+            mode_for_block = next_mode
+            if mode_for_block == "short" and not use_short and use_words:
+                mode_for_block = "words"
+            elif mode_for_block == "words" and not use_words and use_short:
+                mode_for_block = "short"
+
+            # Short blocks: iterative charset labels only, counted in length_stats.
+            # Word blocks: dictionary/POS-only, reserved for word_pos_stats (do not affect length_stats).
+            if mode_for_block == "short":
+                pointer.batch_size = block_count
+                tlds_for_block = Pointer.TLDS
+                current_iter_length = None
+
+                # Round-robin over unfinished lengths using per-length pointer state.
+                if unfinished_lengths:
+                    length_for_block = unfinished_lengths[next_length_rr_index % len(unfinished_lengths)]
+                    next_length_rr_index += 1
+                    current_iter_length = length_for_block
+                    state = pointer.length_states[str(length_for_block)]
+                    batch = generate_batch_for_length(
+                        state,
+                        length_for_block,
+                        pointer.charset,
+                        tlds_for_block,
+                        block_count,
+                        shard_id=pointer.shard_id,
+                        shard_count=pointer.shard_count,
                     )
-        else:
-            for domain, tld in batch:
-                domain, tld, label, length, dns_info, http_info = process_domain(domain, tld)
+                    if state.get("done"):
+                        unfinished_lengths.remove(length_for_block)
+                    short_variant = f"iter_len_{length_for_block}"
+                else:
+                    batch = []
+                    short_variant = "iter_exhausted"
+            else:
+                tlds_for_block = Pointer.TLDS  # reuse the same TLD set
+                # Uses load_words(): cached, and only remapped if the file was regenerated.
+                batch = generate_word_batch(word_pointer, tlds_for_block, block_count)
+                short_variant = "words_mode"
+
+            if not batch:
+                print(f"----- Block {block_index} -----")
+                print("No more domains to process within current configuration.")
+                break
 
+            batch_size_for_block = len(batch)
+            # Block header
+            header = f"----- Block {block_index} start: mode={mode_for_block}"
+            if mode_for_block == "short":
+                if short_variant.startswith("iter_len_") and current_iter_length is not None:
+                    header += f", length={current_iter_length}"
+                else:
+                    header += f", variant={short_variant}"
+            print(header + f", batch={batch_size_for_block} domains -----")
+
+            dns_prefetched = prefetch_dns([item[0] for item in batch]) if batch_resolver_idxs else {}
+
+            def process_domain(domain: str, tld: str, label: str, length: int):
+                dns_info = dns_prefetched.get(domain)
+                if dns_info is None and lookup_cache is not None:
+                    dns_info = lookup_cache.get(domain, "dns")
+                if dns_info is None:
+                    dns_info = resolve_domain(domain)
+
+                http_info = usage_info(USAGE_NO_WEBSITE)
+                if dns_info.get("registered"):
+                    cached_http = lookup_cache.get(domain, "http") if lookup_cache is not None else None
+                    if cached_http is not None:
+                        http_info = cached_http
+                    else:
+                        http_info = check_domain_http(domain)
+                        if lookup_cache is not None:
+                            lookup_cache.put(
+                                domain,
+                                "http",
+                                http_info,
+                                positive=http_info.get("usage_state_id") != USAGE_NO_WEBSITE,
+                            )
+
+                return domain, tld, label, length, dns_info, http_info
+
+            track_lengths = mode_for_block == "short"
+            track_pos = mode_for_block == "words" and bool(word_pos_index)
+
+            def record_result(domain: str, tld: str, label: str, length: int, dns_info: Dict, http_info: Dict) -> None:
                 if print_each:
                     print(
                         f"{domain} -> registered={dns_info.get('registered')}, "
@@ -1074,13 +2050,11 @@ def run(
                         f"product={http_info.get('product_state')}"
                     )
 
-                track_lengths = mode_for_block == "short"
-                pos_label = ""
-                if mode_for_block == "words" and word_pos_index:
-                    pos_label = word_pos_index.get(label, "")
+                pos_label = word_pos_index.get(label, "") if track_pos else ""
                 update_aggregates(
-                    aggr,
-                    domain,
+                    length_stats_by_tld,
+                    tld_stats,
+                    word_pos_stats,
                     tld,
                     length,
                     dns_info,
@@ -1089,70 +2063,98 @@ def run(
                     word_pos_label=pos_label,
                 )
 
-                # Optional small delay to avoid hammering endpoints too hard (single-threaded only)
-                if per_request_delay_ms > 0:
-                    time.sleep(per_request_delay_ms / 1000.0)
-
-        # Build and upload payload for this block
-        date_str = datetime.now(timezone.utc).date().isoformat()
-        batch_id = str(uuid.uuid4())
-        payload = build_payload(date_str, aggr, run_id=run_id, batch_id=batch_id)
-
-        length_stats_list = payload.get("length_stats", [])
-        total_tracked_block = sum(ls.get("tracked_count", 0) for ls in length_stats_list)
-        # Build a compact per-length breakdown for logging (e.g. L7=54, L8=12)
-        length_breakdown_parts = []
-        for ls in length_stats_list:
-            length_val = ls.get("length")
-            tracked_val = ls.get("tracked_count", 0)
-            if tracked_val:
-                length_breakdown_parts.append(f"L{length_val}={tracked_val}")
-        length_breakdown = ", ".join(length_breakdown_parts) if length_breakdown_parts else "none"
-        status_code, body_text = upload_aggregate(api_base, api_key, payload, dry_run=dry_run)
-
-        # Track block-level summary so main() can post a meaningful finish event.
-        summary["blocks"] += 1
-        summary["domains_processed"] += batch_size_for_block
-        if not dry_run and status_code != 200:
-            summary["upload_failures"] += 1
-            log_json(
-                "upload_failed",
-                block=block_index,
-                batch_id=batch_id,
-                status=status_code,
-                body=body_text[:200],
-            )
-        else:
-            log_json(
-                "upload_ok",
-                block=block_index,
-                batch_id=batch_id,
-                domains=batch_size_for_block,
-                length_stats_domains=total_tracked_block,
-            )
+            if executor is not None:
+                futures = [executor.submit(process_domain, *item) for item in batch]
+                for fut in as_completed(futures):
+                    record_result(*fut.result())
+            else:
+                for item in batch:
+                    record_result(*process_domain(*item))
+
+                    # Optional small delay to avoid hammering endpoints too hard (single-threaded only)
+                    if per_request_delay_ms > 0:
+                        time.sleep(per_request_delay_ms / 1000.0)
+
+            # Build and upload payload for this block. Deliberately not memoized:
+            # every block starts from fresh aggregates and gets a new batch_id (the
+            # Worker's idempotency key), and empty batches end the loop above, so a
+            # cached payload could never be reused correctly.
+            date_str = utc_date_str()
+            batch_id = str(uuid.uuid4())
+            payload = build_payload(date_str, aggr, run_id=run_id, batch_id=batch_id)
+
+            length_stats_list = payload.get("length_stats", [])
+            total_tracked_block = sum(ls.get("tracked_count", 0) for ls in length_stats_list)
+            # Build a compact per-length breakdown for logging (e.g. L7=54, L8=12)
+            length_breakdown_parts = []
+            for ls in length_stats_list:
+                length_val = ls.get("length")
+                tracked_val = ls.get("tracked_count", 0)
+                if tracked_val:
+                    length_breakdown_parts.append(f"L{length_val}={tracked_val}")
+            length_breakdown = ", ".join(length_breakdown_parts) if length_breakdown_parts else "none"
+            status_code, body_text = upload_aggregate(api_base, api_key, payload, dry_run=dry_run)
+
+            # Track block-level summary so main() can post a meaningful finish event.
+            summary["blocks"] += 1
+            summary["domains_processed"] += batch_size_for_block
+            if not dry_run and status_code != 200:
+                summary["upload_failures"] += 1
+                log_json(
+                    "upload_failed",
+                    block=block_index,
+                    batch_id=batch_id,
+                    status=status_code,
+                    body=body_text[:200],
+                )
+            else:
+                log_json(
+                    "upload_ok",
+                    block=block_index,
+                    batch_id=batch_id,
+                    domains=batch_size_for_block,
+                    length_stats_domains=total_tracked_block,
+                )
 
-        # Simple console summary for the block
-        if mode_for_block == "short":
-            # Short-mode batches contribute to length_stats (1–10 character view).
-            print(
-                f"----- Block {block_index} done (short): length_stats_domains={total_tracked_block} "
-                f"from {batch_size_for_block} domains, status={status_code}, lengths: {length_breakdown} -----"
-            )
-        else:
-            # Word-mode batches only affect global/tld aggregates (and future word_pos_stats),
-            # so length_stats rows remain unchanged for these blocks.
-            print(
-                f"----- Block {block_index} done (words): {batch_size_for_block} domains processed, "
-                f"length_stats_domains=0, status={status_code} -----"
-            )
+            # Simple console summary for the block
+            if mode_for_block == "short":
+                # Short-mode batches contribute to length_stats (1–10 character view).
+                print(
+                    f"----- Block {block_index} done (short): length_stats_domains={total_tracked_block} "
+                    f"from {batch_size_for_block} domains, status={status_code}, lengths: {length_breakdown} -----"
+                )
+            else:
+                # Word-mode batches only affect global/tld aggregates (and future word_pos_stats),
+                # so length_stats rows remain unchanged for these blocks.
+                print(
+                    f"----- Block {block_index} done (words): {batch_size_for_block} domains processed, "
+                    f"length_stats_domains=0, status={status_code} -----"
+                )
 
-        # Save pointers so progress is kept
-        pointer.save()
-        word_pointer.save()
+            # Save pointers so progress is kept
+            mark_block_completed()
+            blocks_since_checkpoint += 1
+            if blocks_since_checkpoint >= checkpoint_every:
+                flush_checkpoint()
 
-        # Flip mode when both are enabled
-        if use_short and use_words:
-            next_mode = "words" if mode_for_block == "short" else "short"
+            # Flip mode when both are enabled
+            if use_short and use_words:
+                next_mode = "words" if mode_for_block == "short" else "short"
+
+        # The loop only exits between blocks, so the live pointers are consistent
+        # here (and may also carry a length just marked done by an empty batch).
+        mark_block_completed()
+        flush_checkpoint(durable=True)
+    finally:
+        # On an exception this saves the last finished block; after the final
+        # checkpoint above there is nothing pending.
+        flush_pending_checkpoint()
+        if previous_sigterm_handler is not None:
+            signal.signal(signal.SIGTERM, previous_sigterm_handler)
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        if lookup_cache is not None:
+            lookup_cache.close()
 
     # Loop exited. Decide overall status from counters.
     if summary["upload_failures"] > 0 or summary["timed_out"]:
@@ -1173,12 +2175,16 @@ def main() -> None:
     parser.add_argument("--short", action="store_true", help="Enable short label mode (1-10 characters from charset)")
     parser.add_argument("--word", action="store_true", help="Enable word-based mode using words_10_all.txt")
     parser.add_argument("--pause", type=int, default=None, help="Optional pause in seconds between blocks when running continuously")
-    parser.add_argument("--workers", type=int, default=None, help="Optional number of worker threads for DNS/HTTP checks (0 = single-threaded)")
+    parser.add_argument("--workers", type=int, default=None, help=f"Number of worker threads for DNS/HTTP checks (default {DEFAULT_WORKER_COUNT}, or 0 if the config sets per_request_delay_ms; 0 = single-threaded)")
     parser.add_argument("--config-file", type=str, default=None, help="Optional path to a JSON config file (overrides default collector/config.local.json)")
     parser.add_argument("--max-duration", type=int, default=None, help="Max wall-clock seconds before the collector stops cleanly (0 = no limit). Also honors env COLLECTOR_MAX_DURATION.")
     parser.add_argument("--blocks", type=int, default=None, help="Stop cleanly after this many blocks (0 = unlimited). Unlike --max-duration this exit is considered success. Also honors env COLLECTOR_MAX_BLOCKS.")
     parser.add_argument("--run-id", type=str, default=None, help="Explicit run UUID. A fresh one is generated if omitted.")
     parser.add_argument("--source", type=str, default=None, help="Where this run was launched from (e.g. 'local', 'github-actions'). Stored in the runs table.")
+    parser.add_argument("--cache-ttl", type=int, default=None, help="Cache DNS/HTTP results across runs for this many hours (0 = disabled). Negative results are kept at most 24h. Also honors config lookup_cache_ttl_hours.")
+    parser.add_argument("--checkpoint-every", type=int, default=1, help="Save pointer state every N blocks instead of after every block (default 1). Pending state is flushed on exit and SIGTERM.")
+    parser.add_argument("--block-size", type=int, default=0, help=f"Domains per block (default: random {BLOCK_SIZE_MIN}-{BLOCK_SIZE_MAX}). A multiple of {DNS_BATCH_SIZE} keeps batched DoH requests full.")
+    parser.add_argument("--shard", type=str, default=None, help="Run as shard i of N (format i/N, e.g. 0/4): only labels with index %% N == i are checked, with a per-shard pointer. Short mode only.")
     parser.add_argument("--cloud-state", action="store_true", help="Read/write collector state via the Worker /api/admin/state endpoint instead of local JSON files. Also honors env COLLECTOR_CLOUD_STATE=1.")
 
     args = parser.parse_args()
@@ -1186,10 +2192,12 @@ def main() -> None:
     # Load defaults from a config file if present (CLI flag overrides default path)
     config = {}
     config_path = args.config_file or CONFIG_FILE
-    if config_path and os.path.exists(config_path):
+    if config_path:
         try:
             with open(config_path, "r", encoding="utf-8") as f:
                 config = json.load(f)
+        except FileNotFoundError:
+            pass
         except Exception as e:
             print(f"Warning: failed to read config from {config_path}: {e}")
 
@@ -1206,7 +2214,7 @@ def main() -> None:
     )
 
     cfg_block_pause = int(config.get("block_pause_seconds", 0)) if config else 0
-    cfg_workers = int(config.get("worker_count", 0)) if config else 0
+    cfg_workers = config.get("worker_count") if config else None
     if args.pause is not None:
         block_pause_seconds = max(0, args.pause)
     else:
@@ -1214,8 +2222,18 @@ def main() -> None:
 
     if args.workers is not None:
         workers = max(0, args.workers)
+    elif cfg_workers is not None:
+        workers = max(0, int(cfg_workers))
+    elif int(config.get("per_request_delay_ms", 0) or 0) > 0:
+        # The delay paces the single-threaded loop only; threads would drop it.
+        workers = 0
+    else:
+        workers = DEFAULT_WORKER_COUNT
+
+    if args.cache_ttl is not None:
+        cache_ttl_hours = max(0, args.cache_ttl)
     else:
-        workers = max(0, cfg_workers)
+        cache_ttl_hours = max(0, int(config.get("lookup_cache_ttl_hours", 0))) if config else 0
 
     # Cloud-state mode: CLI flag OR env var flips it on. Populating the
     # module-level _CLOUD_STATE dict is what tells Pointer.save/load to use
@@ -1249,6 +2267,30 @@ def main() -> None:
         except ValueError:
             max_blocks = 0
 
+    # Sharding: --shard i/N splits the short-mode label space across N
+    # independent collectors.
+    shard_id, shard_count = 0, 1
+    if args.shard:
+        try:
+            shard_id_str, shard_count_str = args.shard.split("/", 1)
+            shard_id, shard_count = int(shard_id_str), int(shard_count_str)
+        except ValueError:
+            print(f"Error: --shard must look like i/N, got {args.shard!r}.")
+            sys.exit(2)
+        if shard_count < 1 or not 0 <= shard_id < shard_count:
+            print(f"Error: --shard needs 0 <= i < N, got {args.shard!r}.")
+            sys.exit(2)
+        if shard_count > 1 and args.word:
+            print("Error: --shard is only supported in --short mode.")
+            sys.exit(2)
+
+    if args.block_size < 0:
+        print(f"Error: --block-size must be positive, got {args.block_size}.")
+        sys.exit(2)
+
+    if urllib.request.getproxies().get(urllib.parse.urlsplit(api_base).scheme):
+        print(f"Warning: proxy environment variables are ignored for calls to {api_base}.")
+
     # Handle reset flows first — they short-circuit the run lifecycle.
     if args.reset_db:
         if not api_key:
@@ -1256,11 +2298,11 @@ def main() -> None:
             sys.exit(2)
         reset_db(api_base, api_key)
         if args.reset_pointer:
-            reset_pointer()
+            reset_pointer(shard_id, shard_count)
         return
 
     if args.reset_pointer:
-        reset_pointer()
+        reset_pointer(shard_id, shard_count)
         return
 
     if not api_key:
@@ -1281,6 +2323,7 @@ def main() -> None:
         cloud_state=cloud_state_enabled,
         max_duration_seconds=max_duration_seconds,
         max_blocks=max_blocks,
+        shard=f"{shard_id}/{shard_count}",
         use_short=bool(args.short),
         use_words=bool(args.word),
         dry_run=bool(args.dry_run),
@@ -1312,6 +2355,11 @@ def main() -> None:
             run_id=run_id,
             max_duration_seconds=max_duration_seconds,
             max_blocks=max_blocks,
+            cache_ttl_hours=cache_ttl_hours,
+            checkpoint_every=max(1, args.checkpoint_every),
+            shard_id=shard_id,
+            shard_count=shard_count,
+            block_size=args.block_size,
         ) or summary
         if summary.get("status") != "success":
             exit_code = 1
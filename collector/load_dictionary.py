@@ -1,5 +1,12 @@
+import functools
+import json
 import os
+import re
+import tempfile
+import urllib.error
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator
 
 BASE_DIR = os.path.dirname(__file__)
 REPO_ROOT = os.path.abspath(os.path.join(BASE_DIR, os.pardir))
@@ -18,34 +25,110 @@ WORDS_VERBS_PATH = os.path.join(WORDS_DIR, "words_10_verbs.txt")
 WORDS_ADJECTIVES_PATH = os.path.join(WORDS_DIR, "words_10_adjectives.txt")
 WORDS_ADVERBS_PATH = os.path.join(WORDS_DIR, "words_10_adverbs.txt")
 
-MAX_LENGTH = 10
-
+# url -> {"etag", "last_modified"} of the download each per-POS file was last
+# built from, so a rerun can ask for the list only if it has changed.
+VALIDATORS_PATH = os.path.join(WORDS_DIR, "download_validators.json")
 
-def _download(url: str) -> str:
-    with urllib.request.urlopen(url, timeout=30) as resp:
-        return resp.read().decode("utf-8", errors="ignore")
+MAX_LENGTH = 10
 
 
-def _clean_words(text: str):
-    seen = set()
-    for line in text.splitlines():
-        w = line.strip().lower()
-        if not w:
-            continue
-        if len(w) > MAX_LENGTH:
-            continue
-        if not w.isalpha():
-            continue
-        if w in seen:
-            continue
-        seen.add(w)
-        yield w
+# One word per line, surrounding blanks (and a CRLF's \r) allowed. ASCII letters
+# only: the words become domain labels.
+_WORD_RE = re.compile(rb"^[ \t]*([A-Za-z]{1,%d})[ \t\r]*$" % MAX_LENGTH, re.MULTILINE)
+
+
+# Downloads are read and filtered this many bytes at a time, so neither the
+# whole body nor a list of all its lines is ever held in memory.
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+
+
+def _read_blocks(resp) -> Iterator[bytes]:
+    """Yield the body of `resp` in blocks that each end on a line boundary."""
+    tail = b""
+    for chunk in iter(functools.partial(resp.read, DOWNLOAD_CHUNK_BYTES), b""):
+        head, sep, rest = chunk.rpartition(b"\n")
+        if sep:
+            yield tail + head
+            tail = rest
+        else:
+            tail += chunk
+    if tail:
+        yield tail
+
+
+def _clean_words(blocks: Iterable[bytes]) -> Iterator[bytes]:
+    """Lowercased words of at most MAX_LENGTH letters, in file order, duplicates included.
+
+    Words stay ASCII bytes end to end: hashing, sorting and writing them never
+    needs a str.
+    """
+    for block in blocks:
+        for w in _WORD_RE.findall(block):
+            yield w.lower()
+
+
+def _download_words(url: str, path: str, validators: Dict[str, Dict[str, str]]):
+    """Download and clean the list at `url`, or reuse `path` if the server says it is unchanged.
+
+    `validators` holds the ETag / Last-Modified of previous downloads and is
+    updated in place after a fresh one.
+    """
+    cached = validators.get(url) if os.path.exists(path) else None
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+    req = urllib.request.Request(url, headers=headers)
+    try:
+        resp = urllib.request.urlopen(req, timeout=30)
+    except urllib.error.HTTPError as e:
+        if e.code != 304 or not headers:
+            raise
+        e.close()
+        # Not modified: `path` already holds this list, cleaned.
+        with open(path, "rb") as f:
+            return set(_clean_words(_read_blocks(f)))
+    with resp:
+        # The set is the only de-duplication pass.
+        words = set(_clean_words(_read_blocks(resp)))
+        validators[url] = {
+            "etag": resp.headers.get("ETag", ""),
+            "last_modified": resp.headers.get("Last-Modified", ""),
+        }
+    return words
+
+
+def _load_validators() -> Dict[str, Dict[str, str]]:
+    try:
+        with open(VALIDATORS_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
 
 
 def _write_words(path: str, words) -> None:
-    with open(path, "w", encoding="utf-8") as f:
-        for w in sorted(words):
-            f.write(w + "\n")
+    # ASCII bytes sort in the same order as the equivalent strs. One write,
+    # no newline translation.
+    lines = sorted(words)
+    # Replaced atomically rather than truncated in place: a running collector
+    # mmaps words_10_all.txt, and truncating a mapped file crashes it (SIGBUS).
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(b"\n".join(lines) + b"\n" if lines else b"")
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
 
 
 def main() -> None:
@@ -53,11 +136,17 @@ def main() -> None:
 
     os.makedirs(WORDS_DIR, exist_ok=True)
 
-    # Download and clean each POS list separately
-    nouns = set(_clean_words(_download(NOUNS_URL)))
-    verbs = set(_clean_words(_download(VERBS_URL)))
-    adjs = set(_clean_words(_download(ADJECTIVES_URL)))
-    advs = set(_clean_words(_download(ADVERBS_URL)))
+    # Download and clean the four POS lists concurrently, each filtered as it
+    # streams in; lists unchanged since the last run are read back from disk.
+    sources = [
+        (NOUNS_URL, WORDS_NOUNS_PATH),
+        (VERBS_URL, WORDS_VERBS_PATH),
+        (ADJECTIVES_URL, WORDS_ADJECTIVES_PATH),
+        (ADVERBS_URL, WORDS_ADVERBS_PATH),
+    ]
+    validators = _load_validators()
+    with ThreadPoolExecutor(max_workers=len(sources)) as ex:
+        nouns, verbs, adjs, advs = ex.map(lambda src: _download_words(*src, validators), sources)
 
     # Write per-POS files
     _write_words(WORDS_NOUNS_PATH, nouns)
@@ -69,6 +158,11 @@ def main() -> None:
     all_words = nouns | verbs | adjs | advs
     _write_words(WORDS_ALL_PATH, all_words)
 
+    # Only once every file is written, so a failed run never records
+    # validators for a list that is not on disk.
+    with open(VALIDATORS_PATH, "w", encoding="utf-8") as f:
+        json.dump(validators, f, indent=2)
+
     print(
         f"Wrote {len(nouns)} nouns, {len(verbs)} verbs, {len(adjs)} adjectives, {len(advs)} adverbs, "
         f"{len(all_words)} unique words (≤{MAX_LENGTH} chars) to wordlists/."